@@ -0,0 +1,202 @@
+"""Read-only JSON endpoints.
+
+Rows are serialized straight from ``values()`` so no model instances are
+built, and pages are keyset-paginated with the cursors from
+``clac.pagination``. ``?fields=a,b`` narrows the columns; pages larger than
+``STREAM_THRESHOLD`` are streamed row by row so memory stays flat whatever
+``?size`` asks for.
+"""
+
+import json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+
+from .models import LeaderboardEntry, Profile, Showcase
+from .pagination import InvalidCursor, cursor_for, seek
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10_000
+STREAM_THRESHOLD = 500
+ITERATOR_CHUNK_SIZE = 1000
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Resource:
+    """A queryset exposed as JSON: public field names mapped to lookups."""
+
+    def __init__(self, fields, default_fields, ordering):
+        self.fields = fields
+        self.default_fields = default_fields
+        self.ordering = ordering
+
+    def select(self, requested):
+        if not requested:
+            return list(self.default_fields)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(
+                f"Unknown field(s): {', '.join(unknown)}. "
+                f"Available: {', '.join(self.fields)}."
+            )
+        return names
+
+    def rows(self, queryset, names):
+        # Ordering columns are always fetched so the next cursor can be built.
+        keys = [field.lstrip("-") for field in self.ordering]
+        columns, aliases = [], {}
+        for name in dict.fromkeys([*names, *keys]):
+            lookup = self.fields.get(name, name)
+            if lookup == name:
+                columns.append(name)
+            else:
+                aliases[name] = F(lookup)
+        return queryset.values(*columns, **aliases)
+
+
+LEADERBOARD = Resource(
+    fields={
+        "rank": "rank",
+        "profile_id": "profile_id",
+        "username": "profile__user__username",
+        "coins": "coins",
+        "tier": "profile__tier",
+        "joined": "joined",
+    },
+    default_fields=["rank", "username", "coins", "tier"],
+    ordering=("rank", "profile_id"),
+)
+
+SHOWCASES = Resource(
+    fields={
+        "id": "id",
+        "title": "title",
+        "owner_id": "owner_id",
+        "username": "owner__user__username",
+        "link": "link",
+        "body_md": "body_md",
+        "approved": "approved",
+        "rejected": "rejected",
+        "coins_award": "coins_award",
+        "created_at": "created_at",
+        "approved_at": "approved_at",
+    },
+    default_fields=["id", "title", "username", "coins_award", "approved_at"],
+    ordering=("-created_at", "-id"),
+)
+
+
+def api_view(view):
+    """GET-only, gzipped, and ``ApiError`` turned into a JSON error body."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"error": str(error)}, status=error.status)
+
+    return require_GET(gzip_page(wrapper))
+
+
+def login_required_json(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            raise ApiError("Authentication required.", status=401)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def page_size(request):
+    raw = request.GET.get("size")
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(raw)
+    except ValueError:
+        size = 0
+    if not 1 <= size <= MAX_PAGE_SIZE:
+        raise ApiError(f"size must be between 1 and {MAX_PAGE_SIZE}.")
+    return size
+
+
+def paginate(request, resource, queryset):
+    names = resource.select(request.GET.get("fields"))
+    size = page_size(request)
+    try:
+        queryset = seek(queryset, resource.ordering, request.GET.get("cursor"))
+    except InvalidCursor:
+        raise ApiError("invalid cursor") from None
+    rows = resource.rows(queryset, names)
+    if size > STREAM_THRESHOLD:
+        return StreamingHttpResponse(
+            stream_page(rows, resource.ordering, names, size),
+            content_type="application/json",
+        )
+    items = list(rows[: size + 1])
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        next_cursor = cursor_for(items[-1], resource.ordering)
+    return JsonResponse(
+        {"results": [_pick(row, names) for row in items], "next": next_cursor}
+    )
+
+
+def stream_page(rows, ordering, names, size):
+    """Yield the same document as ``paginate`` one row at a time."""
+    encoder = DjangoJSONEncoder()
+    yield '{"results": ['
+    last = None
+    next_cursor = None
+    for count, row in enumerate(
+        rows[: size + 1].iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    ):
+        if count == size:
+            next_cursor = cursor_for(last, ordering)
+            break
+        yield ("" if last is None else ", ") + encoder.encode(_pick(row, names))
+        last = row
+    yield f'], "next": {json.dumps(next_cursor)}}}'
+
+
+def _pick(row, names):
+    return {name: row[name] for name in names}
+
+
+@api_view
+def leaderboard(request):
+    queryset = LeaderboardEntry.objects.all()
+    return paginate(request, LEADERBOARD, queryset)
+
+
+@api_view
+@login_required_json
+def showcases(request):
+    queryset = Showcase.objects.filter(approved=True)
+    return paginate(request, SHOWCASES, queryset)
+
+
+@api_view
+@login_required_json
+def profile_showcases(request, id):
+    """A profile's showcases; pending and rejected ones only for owner or staff."""
+    user_id = Profile.objects.filter(pk=id).values_list("user_id", flat=True).first()
+    if user_id is None:
+        raise ApiError("Profile not found.", status=404)
+    queryset = Showcase.objects.filter(owner_id=id)
+    if not (request.user.is_staff or request.user.pk == user_id):
+        queryset = queryset.filter(approved=True)
+    return paginate(request, SHOWCASES, queryset)
@@ -7,3 +7,6 @@ class ClacConfig(AppConfig):
 
     def ready(self):
         import clac.signals  # noqa: F401
+        from clac.auth import ensure_shared_cache
+
+        ensure_shared_cache()
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path("dashboard/", async_views.dashboard, name="dashboard"),
+    path("profile/", async_views.profile_view, name="profile"),
+    path("showcase/<int:id>/", async_views.showcase_detail, name="showcase_detail"),
+    path("leaderboard/", async_views.leaderboard, name="leaderboard"),
+]
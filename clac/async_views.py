@@ -0,0 +1,64 @@
+"""Async versions of the busiest read-only pages, routed by ``lumin.asgi_urls``.
+
+Everything a template needs is fetched with the async ORM before rendering,
+because templates run synchronously on the event loop and must not query.
+Markdown is rendered in the default executor so it never blocks the loop.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.shortcuts import aget_object_or_404, render
+
+from . import images, ranking
+from .conditional import async_leaderboard_condition, async_showcase_condition
+from .models import LISTING_ORDER, Profile, Showcase
+from .pagination import clean_cursor
+from .rendering import aget_body_html
+
+
+async def _own_showcases(request):
+    user = request.user = await request.auser()
+    if User.profile.is_cached(user):  # loaded alongside the user by clac.auth
+        profile = user.profile
+    else:
+        profile = await Profile.objects.select_related("user").aget(user=user)
+    cursor = clean_cursor(request.GET.get("cursor"), Showcase, LISTING_ORDER)
+    page = await sync_to_async(profile.showcases.listing_page)(cursor)
+    return {"profile": profile, "page": page, "cursor": cursor}
+
+
+@login_required
+async def dashboard(request):
+    return render(request, "clac/dashboard.html", await _own_showcases(request))
+
+
+@login_required
+async def profile_view(request):
+    return render(request, "clac/profile.html", await _own_showcases(request))
+
+
+@login_required
+@async_showcase_condition
+async def showcase_detail(request, id):
+    showcase = await aget_object_or_404(
+        Showcase.objects.select_related("owner__user"), id=id
+    )
+    body_html = await aget_body_html(showcase)
+    # Building missing derivatives touches storage and the database.
+    screenshot_url = await sync_to_async(images.derivative_url)(showcase, "full")
+    return render(
+        request,
+        "clac/showcase_detail.html",
+        {
+            "showcase": showcase,
+            "body_html": body_html,
+            "screenshot_url": screenshot_url,
+        },
+    )
+
+
+@async_leaderboard_condition
+async def leaderboard(request):
+    profiles = [profile async for profile in ranking.top(10)]
+    return render(request, "clac/leaderboard.html", {"profiles": profiles})
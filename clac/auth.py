@@ -0,0 +1,88 @@
+"""Cached user lookups for authenticated requests.
+
+``CachedModelBackend`` loads the ``User`` together with its ``Profile`` in one
+query and keeps the pair in the ``AUTH_USER_CACHE`` alias, so a request whose
+session is also cached reads nothing from the database before the view runs.
+Anything that changes either row calls ``forget``: saves and deletes do so
+through signals, and the coin UPDATE in ``clac.moderation`` does it directly.
+
+Those deletes only reach other server processes if the cache is shared, so
+``ensure_shared_cache`` refuses a per-process backend for it, the session
+cache and the fragment cache when ``WORKER_PROCESSES`` is above one.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+
+def _cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE", "default")]
+
+
+def _key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def _timeout():
+    return getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 300)
+
+
+def _users():
+    return User._default_manager.select_related("profile")
+
+
+def ensure_shared_cache():
+    """Raise ``ImproperlyConfigured`` if several workers would each cache alone."""
+    if getattr(settings, "WORKER_PROCESSES", 1) <= 1:
+        return
+    aliases = {
+        getattr(settings, "AUTH_USER_CACHE", "default"),
+        getattr(settings, "FRAGMENT_CACHE", "default"),
+    }
+    if settings.SESSION_ENGINE.endswith((".cache", ".cached_db")):
+        aliases.add(settings.SESSION_CACHE_ALIAS)
+    for alias in sorted(aliases):
+        if isinstance(caches[alias], LocMemCache):
+            raise ImproperlyConfigured(
+                f"The {alias!r} cache is per-process but WORKER_PROCESSES is "
+                f"{settings.WORKER_PROCESSES}; invalidations in one worker "
+                "would not reach the others. Use a shared backend."
+            )
+
+
+def forget(user_id):
+    """Drop a cached user now and again once the current transaction commits.
+
+    The second delete stops a request that read the old rows mid-transaction
+    from leaving them cached.
+    """
+    key = _key(user_id)
+    _cache().delete(key)
+    transaction.on_commit(lambda: _cache().delete(key))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        cache = _cache()
+        user = cache.get(_key(user_id))
+        if user is None:
+            user = _users().filter(pk=user_id).first()
+            if user is None:
+                return None
+            cache.set(_key(user_id), user, _timeout())
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        cache = _cache()
+        user = await cache.aget(_key(user_id))
+        if user is None:
+            user = await _users().filter(pk=user_id).afirst()
+            if user is None:
+                return None
+            await cache.aset(_key(user_id), user, _timeout())
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,328 @@
+import asyncio
+import inspect
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection, transaction
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import counters, ranking
+from .models import CoinTransaction, Profile, Showcase, tier_for
+from .rendering import body_hash, render_markdown
+
+BODIES = [
+    "# Build notes\n\nShort write-up with **bold** text and a list:\n\n- one\n- two\n",
+    "Fenced example:\n\n```python\ndef award(coins):\n    return coins * 2\n```\n",
+    "A longer post.\n\n" + "Paragraph of text about the project. " * 40,
+]
+
+STAFF_USERNAME = "bench-staff"
+
+# Which URLconf each server type routes through; see lumin.asgi.
+URLCONFS = {"wsgi": "lumin.urls", "asgi": "lumin.asgi_urls"}
+
+
+def seed(profiles, showcases, batch_size=5000, log=None):
+    """Bulk-insert ``profiles`` users/profiles and ``showcases`` showcases."""
+    log = log or (lambda message: None)
+    rng = random.Random(42)
+    password = make_password("bench")
+    now = timezone.now()
+    rendered = {body: (render_markdown(body), body_hash(body)) for body in BODIES}
+
+    first_user = (
+        User.objects.order_by("-pk").values_list("pk", flat=True).first()
+    ) or 0
+    for start in range(0, profiles, batch_size):
+        count = min(batch_size, profiles - start)
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                User(
+                    username=f"bench-{first_user + start + i}",
+                    password=password,
+                    email=f"bench-{first_user + start + i}@paycorp.local",
+                )
+                for i in range(count)
+            )
+            coins = [rng.randrange(0, 2000) for _ in users]
+            profiles_batch = Profile.objects.bulk_create(
+                Profile(
+                    user=user,
+                    coins=amount,
+                    tier=tier_for(amount),
+                    joined=now - timedelta(minutes=rng.randrange(525_600)),
+                )
+                for user, amount in zip(users, coins)
+            )
+            CoinTransaction.objects.bulk_create(
+                CoinTransaction(
+                    profile=profile,
+                    amount=profile.coins,
+                    kind=CoinTransaction.OPENING,
+                )
+                for profile in profiles_batch
+                if profile.coins
+            )
+        log(f"Seeded {start + count}/{profiles} profiles")
+
+    profile_ids = list(Profile.objects.values_list("pk", flat=True))
+    for start in range(0, showcases, batch_size):
+        count = min(batch_size, showcases - start)
+        batch = []
+        for i in range(count):
+            body = rng.choice(BODIES)
+            approved = rng.random() < 0.8
+            html, digest = rendered[body]
+            batch.append(
+                Showcase(
+                    owner_id=rng.choice(profile_ids),
+                    title=f"Showcase {start + i}",
+                    body_md=body,
+                    body_html=html,
+                    body_html_hash=digest,
+                    approved=approved,
+                    coins_award=rng.randrange(0, 200) if approved else 0,
+                    approved_at=now if approved else None,
+                )
+            )
+        with transaction.atomic():
+            Showcase.objects.bulk_create(batch)
+        log(f"Seeded {start + count}/{showcases} showcases")
+
+    if not User.objects.filter(username=STAFF_USERNAME).exists():
+        User.objects.create_user(
+            STAFF_USERNAME, password="bench", is_staff=True, is_superuser=True
+        )
+    ranking.rebuild()
+    log("Rebuilt the leaderboard")
+    counters.recount()
+    log("Recounted showcase counters")
+
+
+class Scenario:
+    """One request type; ``user`` is None, "member" or "staff"."""
+
+    def __init__(self, name, user, request):
+        self.name = name
+        self.user = user
+        self.request = request
+
+
+def scenarios():
+    showcase_ids = list(
+        Showcase.objects.filter(approved=True).values_list("pk", flat=True)[:10_000]
+    )
+    pending = iter(
+        Showcase.objects.pending().order_by("-pk").values_list("pk", flat=True)
+    )
+    pending_lock = threading.Lock()
+
+    def approve(client):
+        with pending_lock:
+            showcase_id = next(pending, None)
+        if showcase_id is None:
+            return None
+        return client.post(
+            reverse("approve_showcase", args=[showcase_id]), {"coins": 10}
+        )
+
+    return {
+        "leaderboard": Scenario(
+            "leaderboard", None, lambda client: client.get(reverse("leaderboard"))
+        ),
+        "dashboard": Scenario(
+            "dashboard", "member", lambda client: client.get(reverse("dashboard"))
+        ),
+        "showcase_detail": Scenario(
+            "showcase_detail",
+            "member",
+            lambda client: client.get(
+                reverse("showcase_detail", args=[random.choice(showcase_ids)])
+            ),
+        ),
+        "review_queue": Scenario(
+            "review_queue", "staff", lambda client: client.get(reverse("review_queue"))
+        ),
+        "approve_showcase": Scenario("approve_showcase", "staff", approve),
+    }
+
+
+def _client(user, client_class=Client):
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+    client = client_class(
+        headers={"host": hosts[0].lstrip(".") if hosts else "localhost"}
+    )
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _split(requests, concurrency):
+    """Requests per worker, spread as evenly as possible; no empty workers."""
+    per_worker = [requests // concurrency] * concurrency
+    for i in range(requests % concurrency):
+        per_worker[i] += 1
+    return [count for count in per_worker if count]
+
+
+def drive(scenario, users, requests, concurrency):
+    """Issue ``requests`` requests for ``scenario`` from ``concurrency`` threads."""
+    latencies = []
+    queries = []
+    errors = 0
+    lock = threading.Lock()
+    per_worker = _split(requests, concurrency)
+
+    def worker(count):
+        nonlocal errors
+        client = _client(users[scenario.user])
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                response = scenario.request(client)
+                elapsed = time.perf_counter() - started
+                if response is None:
+                    continue
+                with lock:
+                    if response.status_code >= 400:
+                        errors += 1
+                    latencies.append(elapsed)
+                    queries.append(response.wsgi_request.perf.queries)
+        finally:
+            close_old_connections()
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, per_worker))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, queries, errors, elapsed)
+
+
+def drive_async(scenario, users, requests, concurrency):
+    """``drive`` through the ASGI handler: ``concurrency`` tasks on one loop."""
+    latencies = []
+    queries = []
+    errors = 0
+    per_worker = _split(requests, concurrency)
+    # Logging in queries the database, so it happens before the loop starts.
+    clients = [_client(users[scenario.user], AsyncClient) for _ in per_worker]
+
+    async def worker(client, count):
+        nonlocal errors
+        for _ in range(count):
+            started = time.perf_counter()
+            response = scenario.request(client)
+            if inspect.isawaitable(response):
+                response = await response
+            elapsed = time.perf_counter() - started
+            if response is None:
+                continue
+            if response.status_code >= 400:
+                errors += 1
+            latencies.append(elapsed)
+            queries.append(response.asgi_request.perf.queries)
+
+    async def main():
+        await asyncio.gather(
+            *(worker(client, count) for client, count in zip(clients, per_worker))
+        )
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    close_old_connections()
+    return summarize(latencies, queries, errors, elapsed)
+
+
+def summarize(latencies, queries, errors, elapsed):
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p90": round(_percentile(latencies, 90) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "queries": {
+            "mean": round(statistics.fmean(queries), 2),
+            "max": max(queries),
+        },
+    }
+
+
+def run(names=None, requests=200, concurrency=8, server="wsgi"):
+    """Benchmark the scenarios through the ``"wsgi"`` or ``"asgi"`` handler."""
+    available = scenarios()
+    users = {
+        None: None,
+        "member": Profile.objects.order_by("-coins")
+        .select_related("user")
+        .first()
+        .user,
+        "staff": User.objects.get(username=STAFF_USERNAME),
+    }
+    results = {}
+    driver = drive_async if server == "asgi" else drive
+    hosts = list(settings.ALLOWED_HOSTS)
+    if server == "asgi":
+        # AsyncClient always sends "Host: testserver" alongside any override.
+        hosts.append("testserver")
+    with override_settings(ROOT_URLCONF=URLCONFS[server], ALLOWED_HOSTS=hosts):
+        for name in names or available:
+            results[name] = driver(available[name], users, requests, concurrency)
+    return {
+        "meta": {
+            "timestamp": timezone.now().isoformat(),
+            "django": django.get_version(),
+            "db_profile": getattr(settings, "DB_PROFILE", None),
+            "profiles": Profile.objects.count(),
+            "showcases": Showcase.objects.count(),
+            "requests": requests,
+            "concurrency": concurrency,
+            "server": server,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(previous, current):
+    """Relative change of p50/p99 latency, throughput and queries per scenario."""
+    changes = {}
+    for name, now in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before or not before.get("requests") or not now.get("requests"):
+            continue
+        changes[name] = {
+            "p50_ms": _delta(before["latency_ms"]["p50"], now["latency_ms"]["p50"]),
+            "p99_ms": _delta(before["latency_ms"]["p99"], now["latency_ms"]["p99"]),
+            "throughput_rps": _delta(before["throughput_rps"], now["throughput_rps"]),
+            "queries_max": now["queries"]["max"] - before["queries"]["max"],
+        }
+    return changes
+
+
+def _delta(before, after):
+    if not before:
+        return None
+    return round((after - before) / before * 100, 1)
@@ -0,0 +1,124 @@
+"""ETag / Last-Modified validators for ``django.views.decorators.http.condition``.
+
+Each validator costs one indexed query and never touches templates or
+markdown. ETags include the requesting user because the pages render the
+navigation bar for whoever is logged in, and a digest of the CSRF secret
+because the logout form embeds a token derived from it (the secret rotates on
+every login). A request with flash messages waiting is never answered with a
+304, since only a full render shows them.
+
+``condition`` calls its validators synchronously even around async views, so
+the ``async_*`` decorators load the same values with the async ORM first and
+the validators only read them back.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.middleware.csrf import get_token
+from django.views.decorators.http import condition
+
+from . import ranking
+from .models import Showcase
+
+
+def _user_key(request):
+    # get_token() issues the secret now if the client has none yet, so the
+    # ETag names the same secret the rendered page's token comes from.
+    get_token(request)
+    secret = request.META["CSRF_COOKIE"]
+    csrf = hashlib.sha256(secret.encode()).hexdigest()[:12]
+    return f"{request.user.pk or 0}-{csrf}"
+
+
+def _has_messages(request):
+    if not hasattr(request, "_has_messages"):
+        # len() peeks at the storage without marking the messages as shown.
+        request._has_messages = bool(len(messages.get_messages(request)))
+    return request._has_messages
+
+
+def _showcase_stamps(request, id):
+    # condition() asks for the ETag and Last-Modified separately; share the row.
+    if not hasattr(request, "_showcase_stamps"):
+        request._showcase_stamps = (
+            Showcase.objects.filter(pk=id).values_list("version", "updated_at").first()
+        )
+    return request._showcase_stamps
+
+
+def showcase_etag(request, id):
+    stamps = _showcase_stamps(request, id)
+    if stamps is None or _has_messages(request):
+        return None
+    version, updated_at = stamps
+    return f"showcase-{id}-v{version}-{updated_at.timestamp()}-u{_user_key(request)}"
+
+
+def showcase_last_modified(request, id):
+    stamps = _showcase_stamps(request, id)
+    return stamps[1] if stamps and not _has_messages(request) else None
+
+
+def _leaderboard_stamp(request):
+    if not hasattr(request, "_leaderboard_stamp"):
+        request._leaderboard_stamp = ranking.last_changed()
+    return request._leaderboard_stamp
+
+
+def leaderboard_etag(request):
+    stamp = _leaderboard_stamp(request)
+    if stamp is None or _has_messages(request):
+        return None
+    return f"leaderboard-{stamp.timestamp()}-u{_user_key(request)}"
+
+
+def leaderboard_last_modified(request):
+    return None if _has_messages(request) else _leaderboard_stamp(request)
+
+
+showcase_condition = condition(
+    etag_func=showcase_etag, last_modified_func=showcase_last_modified
+)
+leaderboard_condition = condition(
+    etag_func=leaderboard_etag, last_modified_func=leaderboard_last_modified
+)
+
+
+async def _aload_showcase_stamps(request, id):
+    if not hasattr(request, "_showcase_stamps"):
+        request._showcase_stamps = (
+            await Showcase.objects.filter(pk=id)
+            .values_list("version", "updated_at")
+            .afirst()
+        )
+
+
+async def _aload_leaderboard_stamp(request):
+    if not hasattr(request, "_leaderboard_stamp"):
+        request._leaderboard_stamp = await ranking.alast_changed()
+
+
+def _preloaded(load, conditional):
+    def decorator(view):
+        conditional_view = conditional(view)
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            request.user = await request.auser()
+            await load(request, *args, **kwargs)
+            # Message storage may read the session, which can hit the DB.
+            await sync_to_async(_has_messages)(request)
+            return await conditional_view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async_showcase_condition = _preloaded(_aload_showcase_stamps, showcase_condition)
+async_leaderboard_condition = _preloaded(
+    _aload_leaderboard_stamp, leaderboard_condition
+)
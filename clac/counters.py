@@ -0,0 +1,117 @@
+"""Showcase counters kept on ``Profile``.
+
+``showcases_pending``, ``showcases_approved``, ``showcases_rejected`` and
+``coins_awarded`` let the dashboard and profile page show totals without
+aggregating ``Showcase``. They change in the same transaction as the rows
+they count: submission and deletion through signals, approval and rejection
+in ``clac.moderation``. Anything else that touches showcases (bulk inserts,
+admin edits of the status flags) leaves them to ``recount``.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from . import auth
+from .models import Profile
+
+FIELDS = {
+    "pending": "showcases_pending",
+    "approved": "showcases_approved",
+    "rejected": "showcases_rejected",
+    "awarded": "coins_awarded",
+}
+
+Drift = namedtuple("Drift", ["profile_id", "stored", "actual"])
+
+
+def status(showcase):
+    if showcase.approved:
+        return "approved"
+    if showcase.rejected:
+        return "rejected"
+    return "pending"
+
+
+def contribution(showcase):
+    """The counter deltas one showcase accounts for."""
+    deltas = {status(showcase): 1}
+    if showcase.approved:
+        deltas["awarded"] = showcase.coins_award
+    return deltas
+
+
+def updates(**deltas):
+    """``Profile.objects.update`` kwargs shifting counters by ``deltas``.
+
+    Decrements stop at zero, so counters that have already drifted cannot
+    break the update; ``recount`` puts them right.
+    """
+    fields = {}
+    for name, delta in deltas.items():
+        field = FIELDS[name]
+        if delta > 0:
+            fields[field] = F(field) + delta
+        elif delta < 0:
+            fields[field] = Greatest(F(field) + delta, Value(0))
+    return fields
+
+
+def shift(profile_id, user_id=None, **deltas):
+    """Shift one profile's counters, e.g. ``shift(7, pending=-1, rejected=1)``."""
+    fields = updates(**deltas)
+    if not fields:
+        return
+    Profile.objects.filter(pk=profile_id).update(**fields)
+    if user_id is None:
+        user_id = (
+            Profile.objects.filter(pk=profile_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+    if user_id is not None:
+        auth.forget(user_id)
+
+
+def actual_counts():
+    """Annotations computing every counter from ``Showcase`` in one grouped query."""
+    approved = Q(showcases__approved=True)
+    rejected = Q(showcases__approved=False, showcases__rejected=True)
+    pending = Q(showcases__approved=False, showcases__rejected=False)
+    return {
+        "actual_pending": Count("showcases", filter=pending),
+        "actual_approved": Count("showcases", filter=approved),
+        "actual_rejected": Count("showcases", filter=rejected),
+        "actual_awarded": Coalesce(
+            Sum("showcases__coins_award", filter=approved), Value(0)
+        ),
+    }
+
+
+def recount(fix=True, batch_size=500):
+    """Compare every profile's counters with its showcases.
+
+    Returns the ``Drift`` of each profile that disagreed; with ``fix`` those
+    profiles are updated to the actual values.
+    """
+    fields = list(FIELDS.values())
+    with transaction.atomic():
+        rows = Profile.objects.annotate(**actual_counts()).only("user_id", *fields)
+        drifted = []
+        stale = []
+        for profile in rows.order_by("pk").iterator(chunk_size=2000):
+            stored = tuple(getattr(profile, field) for field in fields)
+            actual = tuple(getattr(profile, f"actual_{name}") for name in FIELDS)
+            if stored == actual:
+                continue
+            drifted.append(Drift(profile.pk, stored, actual))
+            for field, value in zip(fields, actual):
+                setattr(profile, field, value)
+            stale.append(profile)
+        if fix and stale:
+            Profile.objects.bulk_update(stale, fields, batch_size=batch_size)
+            for profile in stale:
+                auth.forget(profile.user_id)
+    return drifted
@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 
 from .models import Showcase
@@ -33,6 +34,11 @@ class ShowcaseForm(forms.ModelForm):
         model = Showcase
         fields = ["title", "body_md", "link", "screenshot","email"    ]  # ✅ Removed 'attachment'
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Files dropped by CappedImageUploadHandler before they reached FILES.
+        self.upload_errors = upload_errors or {}
+
     def clean_title(self):
         title = self.cleaned_data.get("title")
         if not title:
@@ -46,3 +52,18 @@ class ShowcaseForm(forms.ModelForm):
         if len(body) < 10:
             raise forms.ValidationError("Body is too short.")
         return body
+
+    def clean_screenshot(self):
+        screenshot = self.cleaned_data.get("screenshot")
+        image = getattr(screenshot, "image", None)
+        if image is not None:
+            width, height = image.size
+            if width * height > settings.SCREENSHOT_MAX_PIXELS:
+                raise forms.ValidationError("Image has too many pixels.")
+        return screenshot
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.upload_errors.items():
+            self.add_error(field, message)
+        return cleaned_data
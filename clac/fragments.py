@@ -0,0 +1,93 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+# Cached template fragments: the invalidation scope each belongs to and how
+# many of its leading vary-on arguments key that scope (e.g. the owner id).
+FRAGMENT_SCOPES = {
+    "leaderboard": ("leaderboard", 0),
+    "ranking_top": ("leaderboard", 0),
+    "ranking_window": ("windows", 0),
+    "showcases": ("showcases", 1),
+    "profile_showcases": ("showcases", 1),
+}
+
+
+def _cache():
+    return caches[getattr(settings, "FRAGMENT_CACHE", "default")]
+
+
+def _version_key(scope, vary_on):
+    return ":".join(["fragment-version", scope, *map(str, vary_on)])
+
+
+def version(scope, *vary_on):
+    """Current version token of a scope, e.g. ``version("showcases", 12)``."""
+    cache = _cache()
+    key = _version_key(scope, vary_on)
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        token = cache.get(key)
+    return token
+
+
+def bump(scope, *vary_on):
+    """Invalidate every fragment in a scope by giving it a fresh version.
+
+    Tokens are random rather than counters so a reset cache can never hand
+    out a version that matches a stale entry.
+    """
+    _cache().set(_version_key(scope, vary_on), uuid.uuid4().hex, timeout=None)
+
+
+def invalidate(scope, *vary_on):
+    """Bump a scope now and again once the current transaction commits.
+
+    The second bump drops anything a concurrent request cached from rows
+    read before the commit.
+    """
+    bump(scope, *vary_on)
+    transaction.on_commit(lambda: bump(scope, *vary_on))
+
+
+def fragment_key(name, vary_on):
+    scope, scoped_args = FRAGMENT_SCOPES[name]
+    token = version(scope, *vary_on[:scoped_args])
+    return ":".join(["fragment", name, *map(str, vary_on), token])
+
+
+def get_or_render(name, vary_on, render):
+    """Cached output of ``render()`` for a fragment, counting hits and misses."""
+    cache = _cache()
+    key = fragment_key(name, vary_on)
+    content = cache.get(key)
+    _record(name, hit=content is not None)
+    if content is None:
+        content = render()
+        cache.set(key, content, getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 86400))
+    return content
+
+
+def _record(name, hit):
+    cache = _cache()
+    key = f"fragment-stats:{name}:{'hits' if hit else 'misses'}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:  # evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def stats():
+    keys = {
+        name: (f"fragment-stats:{name}:hits", f"fragment-stats:{name}:misses")
+        for name in FRAGMENT_SCOPES
+    }
+    values = _cache().get_many([key for pair in keys.values() for key in pair])
+    return {
+        name: {"hits": values.get(hits, 0), "misses": values.get(misses, 0)}
+        for name, (hits, misses) in keys.items()
+    }
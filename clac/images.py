@@ -0,0 +1,106 @@
+import hashlib
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes; images are scaled down to fit and never scaled up.
+DERIVATIVE_SIZES = {
+    "thumb": (160, 120),
+    "card": (480, 360),
+    "full": (1280, 960),
+}
+
+
+def derivative_format():
+    fmt = getattr(settings, "SCREENSHOT_DERIVATIVE_FORMAT", "WEBP")
+    if fmt == "WEBP" and not features.check("webp"):
+        return "JPEG"
+    return fmt
+
+
+def file_digest(field_file):
+    digest = hashlib.sha256()
+    with field_file.open("rb"):
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derivative_name(original_name, digest, size):
+    """Content-addressed path next to the original: screens/derived/<sha>/thumb.webp."""
+    fmt = derivative_format()
+    extension = "jpg" if fmt == "JPEG" else fmt.lower()
+    return posixpath.join(
+        posixpath.dirname(original_name), "derived", digest, f"{size}.{extension}"
+    )
+
+
+def build_derivatives(showcase):
+    """Write any missing derivatives of the showcase screenshot.
+
+    Returns the screenshot digest, or "" when there is nothing to build.
+    """
+    field_file = showcase.screenshot
+    if not field_file:
+        return ""
+    digest = showcase.screenshot_digest or file_digest(field_file)
+    storage = field_file.storage
+    missing = {
+        size: derivative_name(field_file.name, digest, size)
+        for size in DERIVATIVE_SIZES
+    }
+    missing = {size: name for size, name in missing.items() if not storage.exists(name)}
+    if missing:
+        fmt = derivative_format()
+        with field_file.open("rb"), Image.open(field_file) as original:
+            image = ImageOps.exif_transpose(original)
+            if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            for size, name in missing.items():
+                derivative = image.copy()
+                derivative.thumbnail(DERIVATIVE_SIZES[size], Image.LANCZOS)
+                buffer = BytesIO()
+                derivative.save(buffer, fmt, quality=82)
+                storage.save(name, ContentFile(buffer.getvalue()))
+
+    if digest != showcase.screenshot_digest:
+        showcase.screenshot_digest = digest
+        type(showcase).objects.filter(pk=showcase.pk).update(screenshot_digest=digest)
+    return digest
+
+
+def delete_derivatives(storage, original_name):
+    """Remove every derivative of a content-addressed original."""
+    digest = posixpath.splitext(posixpath.basename(original_name))[0]
+    for size in DERIVATIVE_SIZES:
+        storage.delete(derivative_name(original_name, digest, size))
+
+
+def try_build_derivatives(showcase):
+    """``build_derivatives`` that logs unreadable images instead of raising."""
+    try:
+        return build_derivatives(showcase)
+    except (OSError, Image.DecompressionBombError):
+        logger.exception("Could not build derivatives for showcase %s", showcase.pk)
+        return ""
+
+
+def derivative_url(showcase, size):
+    """URL of a derivative, generating the set on first request if needed."""
+    field_file = showcase.screenshot
+    if not field_file:
+        return ""
+    digest = showcase.screenshot_digest
+    if not digest or not field_file.storage.exists(
+        derivative_name(field_file.name, digest, size)
+    ):
+        digest = try_build_derivatives(showcase)
+        if not digest:
+            return field_file.url
+    return field_file.storage.url(derivative_name(field_file.name, digest, size))
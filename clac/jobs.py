@@ -0,0 +1,46 @@
+"""Slow follow-up work queued from saves and moderation (see clac.tasks)."""
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from . import images, rendering
+from .models import Showcase
+from .tasks import task
+
+
+@task(priority=5)
+def build_screenshot_derivatives(showcase_id):
+    showcase = Showcase.objects.filter(pk=showcase_id).first()
+    if showcase is not None:
+        images.try_build_derivatives(showcase)
+
+
+@task(priority=1)
+def warm_showcase_html(showcase_id):
+    showcase = Showcase.objects.only("id", "body_md").filter(pk=showcase_id).first()
+    if showcase is not None:
+        rendering.warm_body_html(showcase)
+
+
+@task(max_attempts=8)
+def notify_moderation_decision(showcase_id):
+    """Email the owner that their showcase was approved or rejected."""
+    showcase = (
+        Showcase.objects.select_related("owner__user").filter(pk=showcase_id).first()
+    )
+    if showcase is None or not showcase.owner.user.email:
+        return
+    if showcase.approved:
+        subject = f"“{showcase.title}” was approved"
+        body = f"You were awarded {showcase.coins_award} coins."
+    elif showcase.rejected:
+        subject = f"“{showcase.title}” was not approved"
+        body = f"Moderator note: {showcase.admin_note}"
+    else:
+        return
+    send_mail(
+        subject,
+        body,
+        settings.DEFAULT_FROM_EMAIL,
+        [showcase.owner.user.email],
+    )
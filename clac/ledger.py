@@ -0,0 +1,115 @@
+"""Balances derived from the coin ledger.
+
+A balance is the profile's latest ``BalanceSnapshot`` plus the sum of its
+transactions after that snapshot, so reading it never scans the whole
+history. ``take_snapshots`` and ``mismatches`` work on every profile with
+a single aggregate query each rather than one query per profile.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import BalanceSnapshot, CoinTransaction, Profile
+
+Mismatch = namedtuple("Mismatch", ["profile_id", "coins", "ledger"])
+
+
+def _latest_snapshot(profile_ref, field):
+    return Subquery(
+        BalanceSnapshot.objects.filter(profile_id=profile_ref)
+        .order_by("-last_transaction_id")
+        .values(field)[:1]
+    )
+
+
+def _tail_sum(profile_ref, after_ref):
+    return Subquery(
+        CoinTransaction.objects.filter(profile_id=profile_ref, id__gt=after_ref)
+        .values("profile_id")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+
+
+def with_ledger_balance(profiles):
+    """Annotate ``ledger_balance`` (snapshot + tail) onto a Profile queryset."""
+    return profiles.annotate(
+        snapshot_last=Coalesce(
+            _latest_snapshot(OuterRef("pk"), "last_transaction_id"), Value(0)
+        ),
+        snapshot_balance=Coalesce(
+            _latest_snapshot(OuterRef("pk"), "balance"), Value(0)
+        ),
+    ).annotate(
+        ledger_balance=F("snapshot_balance")
+        + Coalesce(_tail_sum(OuterRef("pk"), OuterRef("snapshot_last")), Value(0))
+    )
+
+
+def balance(profile_id):
+    return (
+        with_ledger_balance(Profile.objects.filter(pk=profile_id))
+        .values_list("ledger_balance", flat=True)
+        .get()
+    )
+
+
+def take_snapshots(min_tail=1, batch_size=1000):
+    """Snapshot every profile with at least ``min_tail`` new transactions.
+
+    Returns the number of snapshots written.
+    """
+    with transaction.atomic():
+        upto = CoinTransaction.objects.aggregate(last=Max("id"))["last"]
+        if upto is None:
+            return 0
+        after = Coalesce(
+            _latest_snapshot(OuterRef("profile_id"), "last_transaction_id"), Value(0)
+        )
+        tails = (
+            CoinTransaction.objects.filter(id__lte=upto)
+            .annotate(after=after)
+            .filter(id__gt=F("after"))
+            .values("profile_id")
+            .annotate(
+                tail=Sum("amount"),
+                last=Max("id"),
+                count=Count("id"),
+                previous=Coalesce(
+                    _latest_snapshot(OuterRef("profile_id"), "balance"), Value(0)
+                ),
+            )
+            .filter(count__gte=min_tail)
+            .values_list("profile_id", "previous", "tail", "last")
+        )
+        snapshots = (
+            BalanceSnapshot(
+                profile_id=profile_id,
+                balance=previous + tail,
+                last_transaction_id=last,
+            )
+            for profile_id, previous, tail, last in tails.iterator()
+        )
+        written = 0
+        batch = []
+        for snapshot in snapshots:
+            batch.append(snapshot)
+            if len(batch) >= batch_size:
+                written += len(BalanceSnapshot.objects.bulk_create(batch))
+                batch = []
+        written += len(BalanceSnapshot.objects.bulk_create(batch))
+    return written
+
+
+def mismatches():
+    """Profiles whose ``coins`` disagree with the ledger, in one query."""
+    rows = (
+        with_ledger_balance(Profile.objects.all())
+        .filter(~Q(coins=F("ledger_balance")))
+        .order_by("pk")
+        .values_list("pk", "coins", "ledger_balance")
+    )
+    return (Mismatch(*row) for row in rows.iterator())
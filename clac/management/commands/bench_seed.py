@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from clac.bench import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-insert synthetic profiles and showcases for benchmarking. "
+        "Point LUMIN_DB_NAME at a scratch database first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", type=int, default=100_000)
+        parser.add_argument("--showcases", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, profiles, showcases, batch_size, **options):
+        seed(profiles, showcases, batch_size=batch_size, log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS("Seeding complete."))
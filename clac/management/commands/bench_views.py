@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clac.bench import compare, run, scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the clac views in-process through the WSGI handler (concurrent "
+        "threads) or the ASGI handler (concurrent tasks) and report throughput, "
+        "latency percentiles and query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Scenario to run (repeatable); defaults to all of them.",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--server",
+            choices=["wsgi", "asgi", "both"],
+            default="wsgi",
+            help="Handler to benchmark; 'both' runs each on the same data.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument(
+            "--baseline", help="Earlier JSON report to compare this run against."
+        )
+
+    def handle(self, *args, **options):
+        names = options["scenarios"]
+        unknown = set(names or []) - set(scenarios())
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        server = options["server"]
+        if server == "both" and options["baseline"]:
+            raise CommandError("--baseline needs a single --server.")
+
+        if server == "both":
+            wsgi = run(names, options["requests"], options["concurrency"], "wsgi")
+            asgi = run(names, options["requests"], options["concurrency"], "asgi")
+            report = {
+                "wsgi": wsgi,
+                "asgi": asgi,
+                "asgi_vs_wsgi_pct": compare(wsgi, asgi),
+            }
+        else:
+            report = run(names, options["requests"], options["concurrency"], server)
+        if options["baseline"]:
+            with open(options["baseline"]) as fh:
+                report["compared_to_baseline_pct"] = compare(json.load(fh), report)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from clac.images import build_derivatives
+from clac.models import Showcase
+
+
+class Command(BaseCommand):
+    help = "Generate missing thumbnail/card/full derivatives for existing screenshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, batch_size, **options):
+        showcases = (
+            Showcase.objects.exclude(screenshot="")
+            .exclude(screenshot__isnull=True)
+            .only("id", "screenshot", "screenshot_digest")
+            .order_by("id")
+        )
+        built = failed = 0
+        for showcase in showcases.iterator(chunk_size=batch_size):
+            try:
+                build_derivatives(showcase)
+            except (OSError, Image.DecompressionBombError) as exc:
+                failed += 1
+                self.stderr.write(f"Showcase {showcase.pk}: {exc}")
+                continue
+            built += 1
+            if built % batch_size == 0:
+                self.stdout.write(f"Processed {built} screenshots...")
+        self.stdout.write(
+            self.style.SUCCESS(f"Built derivatives for {built} screenshots.")
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} screenshots failed."))
@@ -0,0 +1,67 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clac import export
+
+
+class Command(BaseCommand):
+    help = "Stream profiles or approved showcases to CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(export.DATASETS))
+        parser.add_argument("--format", choices=sorted(export.FORMATS), default="csv")
+        parser.add_argument("--since", help="Inclusive start date (YYYY-MM-DD).")
+        parser.add_argument("--until", help="Exclusive end date (YYYY-MM-DD).")
+        parser.add_argument("--after", type=int, help="Only rows with a larger id.")
+        parser.add_argument("--output", help="File to write; stdout by default.")
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Append to --output after the last complete row it holds.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            since = options["since"] and export.parse_bound(options["since"])
+            until = options["until"] and export.parse_bound(options["until"])
+        except ValueError as error:
+            raise CommandError(error)
+
+        after_id = options["after"]
+        header = after_id is None
+        output = options["output"]
+        if options["resume"]:
+            if not output:
+                raise CommandError("--resume needs --output.")
+            if os.path.exists(output):
+                last_id, size = export.resume_point(output, options["format"])
+                # Drop a partially written trailing row before appending.
+                os.truncate(output, size)
+                header = size == 0
+                if last_id is not None:
+                    after_id = last_id
+
+        lines = export.lines(
+            options["dataset"],
+            options["format"],
+            header=header,
+            since=since or None,
+            until=until or None,
+            after_id=after_id,
+            chunk_size=options["chunk_size"],
+        )
+        mode = "a" if options["resume"] else "w"
+        written = 0
+        handle = open(output, mode, newline="") if output else sys.stdout
+        try:
+            for line in lines:
+                handle.write(line)
+                written += 1
+        finally:
+            if output:
+                handle.close()
+        if output:
+            self.stderr.write(f"Wrote {written} lines to {output}.")
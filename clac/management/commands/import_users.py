@@ -0,0 +1,97 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clac import onboarding
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users (and their profiles) from a CSV or NDJSON file with "
+        "username, email and optional password/first_name/last_name columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=onboarding.FORMATS,
+            help="Defaults to the file extension (.csv, .ndjson or .jsonl).",
+        )
+        parser.add_argument("--batch-size", type=int, default=onboarding.BATCH_SIZE)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Password hashing processes; 0 hashes in-process. Default: CPUs.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="File recording how many records are committed; see --resume.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the records the --checkpoint file says are done.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or self.guess_format(path)
+        checkpoint = options["checkpoint"]
+        if options["resume"] and not checkpoint:
+            raise CommandError("--resume needs --checkpoint.")
+        start = 0
+        if options["resume"] and os.path.exists(checkpoint):
+            with open(checkpoint) as fh:
+                start = int(fh.read().strip() or 0)
+            self.stderr.write(f"Resuming after record {start}.")
+
+        started = time.perf_counter()
+        reported = 0
+
+        def progress(result):
+            nonlocal reported
+            if checkpoint:
+                with open(checkpoint, "w") as fh:
+                    fh.write(str(result.processed))
+            for rejected in result.rejected[reported:]:
+                self.stderr.write(
+                    f"Record {rejected.number} ({rejected.username or '?'}): "
+                    f"{rejected.reason}"
+                )
+            reported = len(result.rejected)
+            rate = (result.processed - start) / (time.perf_counter() - started)
+            self.stderr.write(
+                f"{result.processed} records: {result.created} created, "
+                f"{result.skipped} already present, {reported} rejected "
+                f"({rate:.0f} records/s)"
+            )
+
+        with open(path, newline="") as handle:
+            try:
+                result = onboarding.import_users(
+                    onboarding.read_records(handle, fmt),
+                    batch_size=options["batch_size"],
+                    workers=options["workers"],
+                    start=start,
+                    progress=progress,
+                )
+            except json.JSONDecodeError as error:
+                raise CommandError(f"{path}: {error}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created} users; {result.skipped} already "
+                f"present, {len(result.rejected)} rejected."
+            )
+        )
+
+    @staticmethod
+    def guess_format(path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            return "csv"
+        if extension in (".ndjson", ".jsonl"):
+            return "ndjson"
+        raise CommandError("Cannot tell the format from the extension; use --format.")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from clac.ledger import mismatches
+
+
+class Command(BaseCommand):
+    help = "Check every Profile.coins against its ledger balance."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=50, help="How many mismatches to list."
+        )
+
+    def handle(self, *args, limit, **options):
+        count = 0
+        for mismatch in mismatches():
+            count += 1
+            if count <= limit:
+                self.stdout.write(
+                    f"Profile {mismatch.profile_id}: coins={mismatch.coins} "
+                    f"ledger={mismatch.ledger} "
+                    f"({mismatch.coins - mismatch.ledger:+d})"
+                )
+        if count:
+            raise CommandError(f"{count} profiles disagree with the ledger.")
+        self.stdout.write(self.style.SUCCESS("All balances match the ledger."))
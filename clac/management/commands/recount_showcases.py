@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from clac.counters import FIELDS, recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every profile's showcase counters (pending, approved, "
+        "rejected, coins awarded) from its showcases and fix any that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted profiles; exit with an error if any.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=50, help="How many drifted profiles to list."
+        )
+
+    def handle(self, *args, check, limit, **options):
+        drifted = recount(fix=not check)
+        for drift in drifted[:limit]:
+            changes = ", ".join(
+                f"{name} {stored}->{actual}"
+                for name, stored, actual in zip(FIELDS, drift.stored, drift.actual)
+                if stored != actual
+            )
+            self.stdout.write(f"Profile {drift.profile_id}: {changes}")
+        if check and drifted:
+            raise CommandError(f"{len(drifted)} profiles have drifted counters.")
+        if drifted:
+            self.stdout.write(
+                self.style.SUCCESS(f"Fixed the counters of {len(drifted)} profiles.")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("All showcase counters are correct."))
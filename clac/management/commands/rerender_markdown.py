@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from clac.models import Showcase
+from clac.rendering import rerender_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render the cached HTML of every showcase, e.g. after a markdown2 upgrade."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        showcases = Showcase.objects.only("id", "body_md").order_by("id")
+        batch = []
+        total = 0
+        for showcase in showcases.iterator(chunk_size=batch_size):
+            batch.append(showcase)
+            if len(batch) >= batch_size:
+                rerender_batch(batch)
+                total += len(batch)
+                batch = []
+                self.stdout.write(f"Rendered {total} showcases...")
+        rerender_batch(batch)
+        total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Re-rendered {total} showcases."))
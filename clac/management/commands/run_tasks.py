@@ -0,0 +1,39 @@
+import signal
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from clac.tasks import Worker, requeue_stale
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks from the clac_task table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0, help="Seconds between polls."
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no task is ready instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help="Requeue tasks left running this many seconds by a dead worker.",
+        )
+
+    def handle(self, *args, concurrency, poll_interval, burst, stale_after, **options):
+        requeued = requeue_stale(timedelta(seconds=stale_after))
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale tasks.")
+
+        worker = Worker(concurrency=concurrency, poll_interval=poll_interval)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        self.stdout.write(f"Worker {worker.name} started ({concurrency} threads).")
+        processed = worker.run(burst=burst)
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} tasks."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from clac.models import Showcase
+from clac.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the showcase search index in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--after", type=int, default=0, help="Resume after this showcase id."
+        )
+
+    def handle(self, *args, chunk_size, after, **options):
+        backend = get_backend()
+        if not after:
+            backend.clear()
+        showcases = Showcase.objects.only("id", "title", "body_md").order_by("id")
+        total = 0
+        while True:
+            # Keyset chunks keep each transaction short on a live database.
+            chunk = list(showcases.filter(id__gt=after)[:chunk_size])
+            if not chunk:
+                break
+            with transaction.atomic():
+                backend.index(chunk)
+            after = chunk[-1].id
+            total += len(chunk)
+            self.stdout.write(f"Indexed {total} showcases (last id {after})...")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} showcases."))
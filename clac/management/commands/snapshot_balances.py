@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from clac.ledger import take_snapshots
+
+
+class Command(BaseCommand):
+    help = "Snapshot ledger balances so later reads only sum the tail."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-tail",
+            type=int,
+            default=1,
+            help="Skip profiles with fewer new transactions than this.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, min_tail, batch_size, **options):
+        written = take_snapshots(min_tail=min_tail, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} balance snapshots."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showcase",
+            name="body_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="showcase",
+            name="body_html_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name="showcase",
+            name="screenshot",
+            field=models.ImageField(blank=True, null=True, upload_to="screens/"),
+        ),
+    ]
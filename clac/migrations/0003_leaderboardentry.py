@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def rank_existing_profiles(apps, schema_editor):
+    Profile = apps.get_model("clac", "Profile")
+    LeaderboardEntry = apps.get_model("clac", "LeaderboardEntry")
+    profiles = Profile.objects.order_by("-coins", "joined", "pk").values_list(
+        "pk", "coins", "joined"
+    )
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(profile_id=pk, rank=rank, coins=coins, joined=joined)
+            for rank, (pk, coins, joined) in enumerate(profiles, 1)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0002_showcase_body_html"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "profile",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="leaderboard",
+                        serialize=False,
+                        to="clac.profile",
+                    ),
+                ),
+                ("rank", models.PositiveIntegerField(db_index=True)),
+                ("coins", models.PositiveIntegerField()),
+                ("joined", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["-coins", "joined"], name="clac_leaderboard_order"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(rank_existing_profiles, migrations.RunPython.noop),
+    ]
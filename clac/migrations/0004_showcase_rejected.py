@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+def mark_rejected(apps, schema_editor):
+    # Rejections used to only fill in admin_note and leave the row pending.
+    Showcase = apps.get_model("clac", "Showcase")
+    Showcase.objects.filter(approved=False).exclude(admin_note="").update(rejected=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0003_leaderboardentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showcase",
+            name="rejected",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="showcase",
+            index=models.Index(
+                condition=models.Q(("rejected", False)),
+                fields=["approved", "created_at"],
+                name="clac_showcase_queue",
+            ),
+        ),
+        migrations.RunPython(mark_rejected, migrations.RunPython.noop),
+    ]
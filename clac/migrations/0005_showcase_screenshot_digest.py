@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0004_showcase_rejected"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showcase",
+            name="screenshot_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+import clac.storage
+
+
+def count_existing_references(apps, schema_editor):
+    Showcase = apps.get_model("clac", "Showcase")
+    ScreenshotBlob = apps.get_model("clac", "ScreenshotBlob")
+    references = (
+        Showcase.objects.exclude(screenshot="")
+        .exclude(screenshot__isnull=True)
+        .values("screenshot")
+        .annotate(refs=models.Count("id"))
+    )
+    ScreenshotBlob.objects.bulk_create(
+        [
+            ScreenshotBlob(name=row["screenshot"], refs=row["refs"])
+            for row in references
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0005_showcase_screenshot_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScreenshotBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("refs", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="showcase",
+            name="screenshot",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=clac.storage.screenshot_storage,
+                upload_to="screens/",
+            ),
+        ),
+        migrations.RunPython(count_existing_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0006_screenshotblob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leaderboardentry",
+            name="updated_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="showcase",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="showcase",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
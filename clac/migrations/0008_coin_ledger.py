@@ -0,0 +1,114 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_existing_balances(apps, schema_editor):
+    # Existing balances predate the ledger; record each as an opening entry.
+    Profile = apps.get_model("clac", "Profile")
+    CoinTransaction = apps.get_model("clac", "CoinTransaction")
+    balances = Profile.objects.filter(coins__gt=0).values_list("pk", "coins")
+    CoinTransaction.objects.bulk_create(
+        (
+            CoinTransaction(profile_id=pk, amount=coins, kind="opening")
+            for pk, coins in balances.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0007_conditional_get_stamps"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("balance", models.BigIntegerField()),
+                ("last_transaction_id", models.PositiveBigIntegerField()),
+                ("taken_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshots",
+                        to="clac.profile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["profile", "-last_transaction_id"],
+                        name="clac_snapshot_latest",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CoinTransaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("amount", models.IntegerField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("award", "Award"),
+                            ("adjustment", "Adjustment"),
+                            ("opening", "Opening balance"),
+                        ],
+                        default="award",
+                        max_length=12,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transactions",
+                        to="clac.profile",
+                    ),
+                ),
+                (
+                    "showcase",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="transactions",
+                        to="clac.showcase",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["profile", "id"], name="clac_ledger_tail")
+                ],
+            },
+        ),
+        migrations.RunPython(open_existing_balances, migrations.RunPython.noop),
+    ]
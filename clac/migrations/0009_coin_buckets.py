@@ -0,0 +1,69 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def bucket_existing_awards(apps, schema_editor):
+    Showcase = apps.get_model("clac", "Showcase")
+    CoinBucket = apps.get_model("clac", "CoinBucket")
+    totals = (
+        Showcase.objects.filter(approved=True, approved_at__isnull=False)
+        .annotate(day=TruncDate("approved_at"))
+        .values("owner_id", "day")
+        .annotate(coins=models.Sum("coins_award"))
+        .filter(coins__gt=0)
+    )
+    CoinBucket.objects.bulk_create(
+        (
+            CoinBucket(profile_id=row["owner_id"], day=row["day"], coins=row["coins"])
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0008_coin_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CoinBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("coins", models.PositiveIntegerField(default=0)),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buckets",
+                        to="clac.profile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["day", "profile"], name="clac_bucket_window")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("profile", "day"), name="clac_bucket_profile_day"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(bucket_existing_awards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+FTS_TABLE = "clac_showcase_fts"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    Showcase = apps.get_model("clac", "Showcase")
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        "title, body, tokenize='porter unicode61 remove_diacritics 2', "
+        "prefix='2 3')"
+    )
+    rows = Showcase.objects.values_list("id", "title", "body_md").iterator()
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)", rows
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0009_coin_buckets"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.1 on 2026-10-18 13:01
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def count_existing_showcases(apps, schema_editor):
+    # Same grouped query as clac.counters.recount, against historical models.
+    Profile = apps.get_model("clac", "Profile")
+    approved = Q(showcases__approved=True)
+    counted = Profile.objects.annotate(
+        n_pending=Count(
+            "showcases",
+            filter=Q(showcases__approved=False, showcases__rejected=False),
+        ),
+        n_approved=Count("showcases", filter=approved),
+        n_rejected=Count(
+            "showcases", filter=Q(showcases__approved=False, showcases__rejected=True)
+        ),
+        n_awarded=Coalesce(Sum("showcases__coins_award", filter=approved), Value(0)),
+    ).filter(~Q(n_pending=0, n_approved=0, n_rejected=0))
+    profiles = []
+    for profile in counted.iterator(chunk_size=2000):
+        profile.showcases_pending = profile.n_pending
+        profile.showcases_approved = profile.n_approved
+        profile.showcases_rejected = profile.n_rejected
+        profile.coins_awarded = profile.n_awarded
+        profiles.append(profile)
+    Profile.objects.bulk_update(
+        profiles,
+        [
+            "showcases_pending",
+            "showcases_approved",
+            "showcases_rejected",
+            "coins_awarded",
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clac", "0011_task_queue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="coins_awarded",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="showcases_approved",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="showcases_pending",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="showcases_rejected",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="showcase",
+            index=models.Index(
+                fields=["owner", "-created_at", "-id"], name="clac_showcase_owner_list"
+            ),
+        ),
+        migrations.RunPython(count_existing_showcases, migrations.RunPython.noop),
+    ]
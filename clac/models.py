@@ -1,5 +1,32 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from . import images, rendering
+from .pagination import keyset_page
+from .storage import screenshot_storage
+
+TIER_THRESHOLDS = [(1000, "Visionary"), (500, "Innovator"), (100, "Contributor")]
+
+
+def tier_for(coins):
+    for threshold, tier in TIER_THRESHOLDS:
+        if coins >= threshold:
+            return tier
+    return "Explorer"
+
+
+def tier_case(coins):
+    """DB-side ``tier_for`` over an expression such as ``F("coins") + 10``."""
+    return Case(
+        *[
+            When(GreaterThanOrEqual(coins, threshold), then=Value(tier))
+            for threshold, tier in TIER_THRESHOLDS
+        ],
+        default=Value("Explorer"),
+    )
 
 
 class Profile(models.Model):
@@ -16,28 +43,311 @@ class Profile(models.Model):
         default="Explorer",
     )
     joined = models.DateTimeField(auto_now_add=True)
+    # Maintained by clac.counters; "recount_showcases" repairs any drift.
+    showcases_pending = models.PositiveIntegerField(default=0, editable=False)
+    showcases_approved = models.PositiveIntegerField(default=0, editable=False)
+    showcases_rejected = models.PositiveIntegerField(default=0, editable=False)
+    coins_awarded = models.PositiveIntegerField(default=0, editable=False)
 
-    def update_tier(self):
-        c = self.coins
-        self.tier = (
-            "Explorer"
-            if c < 100
-            else "Contributor" if c < 500 else "Innovator" if c < 1000 else "Visionary"
+    @property
+    def showcases_total(self):
+        return (
+            self.showcases_pending + self.showcases_approved + self.showcases_rejected
         )
+
+    def update_tier(self):
+        self.tier = tier_for(self.coins)
         self.save(update_fields=["tier"])
 
 
+# Newest first; the order of every owner's showcase list.
+LISTING_ORDER = ("-created_at", "-id")
+
+
+class ShowcaseQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(approved=False, rejected=False)
+
+    def listing_page(self, cursor=None, size=20):
+        """A keyset page, newest first, of just the fields a showcase list shows."""
+        listed = self.only(
+            "id",
+            "owner_id",
+            "title",
+            "approved",
+            "rejected",
+            "coins_award",
+            "created_at",
+        )
+        return keyset_page(listed, LISTING_ORDER, cursor=cursor, size=size)
+
+
 class Showcase(models.Model):
     owner = models.ForeignKey(
         Profile, on_delete=models.CASCADE, related_name="showcases"
     )
     title = models.CharField(max_length=120)
     body_md = models.TextField()
+    body_html = models.TextField(blank=True, editable=False)
+    body_html_hash = models.CharField(max_length=64, blank=True, editable=False)
     link = models.URLField(blank=True)
     screenshot = models.ImageField(upload_to="screens/", blank=True)
     approved = models.BooleanField(default=False)
+    rejected = models.BooleanField(default=False)
     coins_award = models.PositiveIntegerField(default=0)
     admin_note = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     approved_at = models.DateTimeField(null=True, blank=True)
-    screenshot = models.ImageField(upload_to='screens/', blank=True, null=True)
+    screenshot = models.ImageField(
+        upload_to="screens/", storage=screenshot_storage, blank=True, null=True
+    )
+    screenshot_digest = models.CharField(max_length=64, blank=True, editable=False)
+    # Bumped on every change so HTTP validators never need the row rendered.
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ShowcaseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves the review queue: pending rows in submission order.
+            models.Index(
+                fields=["approved", "created_at"],
+                condition=Q(rejected=False),
+                name="clac_showcase_queue",
+            ),
+            # Serves an owner's showcase list, newest first.
+            models.Index(
+                fields=["owner", "-created_at", "-id"], name="clac_showcase_owner_list"
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "screenshot" in field_names:
+            instance._stored_screenshot = instance.screenshot.name or ""
+        return instance
+
+    def save(self, *args, **kwargs):
+        stored_screenshot = (
+            "" if self._state.adding else getattr(self, "_stored_screenshot", None)
+        )
+        update_fields = kwargs.get("update_fields")
+        body_changed = update_fields is None or "body_md" in update_fields
+        if body_changed and rendering.refresh_body_html(self) and update_fields:
+            kwargs["update_fields"] = {*update_fields, "body_html", "body_html_hash"}
+        if not self._state.adding:
+            self.version += 1
+            if update_fields:
+                kwargs["update_fields"] = {
+                    *kwargs["update_fields"],
+                    "version",
+                    "updated_at",
+                }
+        new_screenshot = bool(self.screenshot) and not self.screenshot._committed
+        if new_screenshot:
+            self.screenshot_digest = ""
+        # Cache warming and derivatives are queued by clac.signals.
+        super().save(*args, **kwargs)
+        if (
+            stored_screenshot is not None
+            and "screenshot" not in self.get_deferred_fields()
+        ):
+            current = self.screenshot.name or ""
+            if current != stored_screenshot:
+                ScreenshotBlob.objects.retain(current)
+                ScreenshotBlob.objects.release(stored_screenshot)
+            self._stored_screenshot = current
+
+    @property
+    def thumb_url(self):
+        return images.derivative_url(self, "thumb")
+
+    @property
+    def card_url(self):
+        return images.derivative_url(self, "card")
+
+    @property
+    def full_url(self):
+        return images.derivative_url(self, "full")
+
+
+class LeaderboardEntry(models.Model):
+    """Materialized rank of a profile, ordered by coins desc then join date."""
+
+    profile = models.OneToOneField(
+        Profile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="leaderboard",
+    )
+    rank = models.PositiveIntegerField(db_index=True)
+    coins = models.PositiveIntegerField()
+    joined = models.DateTimeField()
+    # When the row last changed rank or coins; see ranking.last_changed().
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-coins", "joined"], name="clac_leaderboard_order"),
+        ]
+
+
+class CoinTransaction(models.Model):
+    """Append-only record of every change to ``Profile.coins``."""
+
+    AWARD = "award"
+    ADJUSTMENT = "adjustment"
+    OPENING = "opening"
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="transactions"
+    )
+    amount = models.IntegerField()
+    kind = models.CharField(
+        max_length=12,
+        choices=[
+            (AWARD, "Award"),
+            (ADJUSTMENT, "Adjustment"),
+            (OPENING, "Opening balance"),
+        ],
+        default=AWARD,
+    )
+    showcase = models.ForeignKey(
+        "Showcase",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="transactions",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Serves "tail after snapshot" sums per profile.
+            models.Index(fields=["profile", "id"], name="clac_ledger_tail"),
+        ]
+
+
+class CoinBucket(models.Model):
+    """Coins awarded to a profile on one (local) day, for windowed rankings."""
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="buckets"
+    )
+    day = models.DateField()
+    coins = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "day"], name="clac_bucket_profile_day"
+            ),
+        ]
+        indexes = [
+            # Windowed top-N reads a contiguous range of days.
+            models.Index(fields=["day", "profile"], name="clac_bucket_window"),
+        ]
+
+
+class BalanceSnapshot(models.Model):
+    """A profile's balance covering every transaction up to ``last_transaction_id``."""
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="snapshots"
+    )
+    balance = models.BigIntegerField()
+    last_transaction_id = models.PositiveBigIntegerField()
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["profile", "-last_transaction_id"],
+                name="clac_snapshot_latest",
+            ),
+        ]
+
+
+class Task(models.Model):
+    """A queued call to a function registered with ``clac.tasks.task``."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=8,
+        choices=[
+            (QUEUED, "Queued"),
+            (RUNNING, "Running"),
+            (DONE, "Done"),
+            (FAILED, "Failed"),
+        ],
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # Serves the worker's "next ready task" query.
+            models.Index(
+                fields=["-priority", "run_after"],
+                condition=Q(status="queued"),
+                name="clac_task_ready",
+            ),
+        ]
+
+
+class ScreenshotBlobQuerySet(models.QuerySet):
+    def retain(self, name):
+        if not name:
+            return
+        with transaction.atomic():
+            if self.filter(name=name).update(refs=F("refs") + 1):
+                return
+            try:
+                with transaction.atomic():
+                    self.create(name=name, refs=1)
+            except IntegrityError:
+                self.filter(name=name).update(refs=F("refs") + 1)
+
+    def release(self, name):
+        """Drop one reference; the file goes once nothing points at it."""
+        if not name:
+            return
+        with transaction.atomic():
+            self.filter(name=name, refs__gt=0).update(refs=F("refs") - 1)
+            deleted, _ = self.filter(name=name, refs=0).delete()
+        if deleted:
+            transaction.on_commit(lambda: self._collect(name))
+
+    def _collect(self, name):
+        # A new upload of the same bytes may have re-registered the blob
+        # between the delete and the commit.
+        if self.filter(name=name).exists():
+            return
+        storage = screenshot_storage()
+        images.delete_derivatives(storage, name)
+        storage.delete(name)
+
+
+class ScreenshotBlob(models.Model):
+    """Reference count of a stored screenshot file across Showcase rows."""
+
+    name = models.CharField(max_length=255, unique=True)
+    refs = models.PositiveIntegerField(default=0)
+
+    objects = ScreenshotBlobQuerySet.as_manager()
@@ -0,0 +1,166 @@
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from . import auth, counters, fragments, jobs, ranking
+from .models import CoinTransaction, Profile, Showcase, tier_case
+
+BatchResult = namedtuple("BatchResult", ["applied", "skipped"])
+
+
+def credit(profile_id, coins, showcase_id=None, kind=CoinTransaction.AWARD, **counts):
+    """Record ``coins`` in the ledger and add them to the profile's balance.
+
+    ``counts`` shift the profile's showcase counters in the same UPDATE.
+    """
+    with transaction.atomic():
+        CoinTransaction.objects.create(
+            profile_id=profile_id, amount=coins, kind=kind, showcase_id=showcase_id
+        )
+        _apply(profile_id, coins, **counts)
+
+
+def _apply(profile_id, coins, **counts):
+    # Balance, tier and counters change in a single UPDATE; callers write the
+    # ledger.
+    balance = F("coins") + coins
+    Profile.objects.filter(pk=profile_id).update(
+        coins=balance, tier=tier_case(balance), **counters.updates(**counts)
+    )
+    profile = Profile.objects.only("user_id", "coins", "joined").get(pk=profile_id)
+    ranking.place(profile)
+    auth.forget(profile.user_id)
+
+
+def award_showcase(showcase_id, coins):
+    """Approve a pending showcase and pay its owner.
+
+    The approval flag is flipped with a conditional UPDATE, so a showcase that
+    is no longer pending is never paid twice. Returns False in that case.
+    """
+    stamp = now()
+    with transaction.atomic():
+        flipped = (
+            Showcase.objects.pending()
+            .filter(pk=showcase_id)
+            .update(
+                approved=True,
+                coins_award=coins,
+                approved_at=stamp,
+                version=F("version") + 1,
+                updated_at=stamp,
+            )
+        )
+        if not flipped:
+            return False
+        owner_id = Showcase.objects.values_list("owner_id", flat=True).get(
+            pk=showcase_id
+        )
+        credit(
+            owner_id,
+            coins,
+            showcase_id=showcase_id,
+            pending=-1,
+            approved=1,
+            awarded=coins,
+        )
+        ranking.add_to_bucket(owner_id, coins, stamp)
+        fragments.invalidate("showcases", owner_id)
+        jobs.notify_moderation_decision.enqueue(showcase_id)
+    return True
+
+
+def approve_many(awards):
+    """Approve many ``(showcase_id, coins)`` pairs in a single transaction.
+
+    Showcases that are missing or no longer pending are skipped. Each award
+    gets its own ledger row, but coins are summed per owner so each profile
+    is credited with one UPDATE.
+    """
+    awards = dict(awards)
+    stamp = now()
+    with transaction.atomic():
+        # Claim the pending rows first so a concurrent batch cannot pay them too.
+        Showcase.objects.pending().filter(pk__in=awards).update(
+            approved=True,
+            approved_at=stamp,
+            version=F("version") + 1,
+            updated_at=stamp,
+        )
+        claimed = list(
+            Showcase.objects.filter(pk__in=awards, approved_at=stamp).only(
+                "id", "owner_id"
+            )
+        )
+        per_owner = defaultdict(int)
+        approved = defaultdict(int)
+        for showcase in claimed:
+            showcase.coins_award = awards[showcase.pk]
+            per_owner[showcase.owner_id] += showcase.coins_award
+            approved[showcase.owner_id] += 1
+        Showcase.objects.bulk_update(claimed, ["coins_award"], batch_size=500)
+        CoinTransaction.objects.bulk_create(
+            (
+                CoinTransaction(
+                    profile_id=showcase.owner_id,
+                    amount=showcase.coins_award,
+                    showcase_id=showcase.pk,
+                )
+                for showcase in claimed
+            ),
+            batch_size=500,
+        )
+        for owner_id, coins in per_owner.items():
+            count = approved[owner_id]
+            _apply(owner_id, coins, pending=-count, approved=count, awarded=coins)
+            ranking.add_to_bucket(owner_id, coins, stamp)
+            fragments.invalidate("showcases", owner_id)
+        jobs.notify_moderation_decision.enqueue_many(
+            (showcase.pk,) for showcase in claimed
+        )
+    return BatchResult(len(claimed), len(awards) - len(claimed))
+
+
+def reject_many(reasons):
+    """Reject many ``(showcase_id, reason)`` pairs, taking them out of the queue."""
+    reasons = dict(reasons)
+    stamp = now()
+    with transaction.atomic():
+        pending = list(
+            Showcase.objects.pending()
+            .filter(pk__in=reasons)
+            .select_related("owner")
+            .only("id", "owner_id", "owner__user_id")
+        )
+        for showcase in pending:
+            showcase.admin_note = reasons[showcase.pk]
+            showcase.rejected = True
+            showcase.version = F("version") + 1
+            showcase.updated_at = stamp
+        applied = Showcase.objects.pending().bulk_update(
+            pending,
+            ["admin_note", "rejected", "version", "updated_at"],
+            batch_size=500,
+        )
+        if applied < len(pending):
+            # Rows decided concurrently since the SELECT were left alone by
+            # the UPDATE; keep only the ones this call rejected.
+            mine = set(
+                Showcase.objects.filter(
+                    pk__in=[showcase.pk for showcase in pending],
+                    rejected=True,
+                    updated_at=stamp,
+                ).values_list("pk", flat=True)
+            )
+            pending = [showcase for showcase in pending if showcase.pk in mine]
+        for owner, count in Counter(showcase.owner for showcase in pending).items():
+            counters.shift(
+                owner.pk, user_id=owner.user_id, pending=-count, rejected=count
+            )
+            fragments.invalidate("showcases", owner.pk)
+        jobs.notify_moderation_decision.enqueue_many(
+            (showcase.pk,) for showcase in pending
+        )
+    return BatchResult(applied, len(reasons) - applied)
@@ -0,0 +1,165 @@
+"""Bulk import of users, e.g. a whole team at once.
+
+Records come from CSV (with a header row) or NDJSON and need ``username``
+and ``email``; ``password``, ``first_name`` and ``last_name`` are optional,
+and users without a password get an unusable one. Each batch is validated
+together (email domain, username format, duplicates in the file and in the
+database), its passwords are hashed across a process pool, and its users
+and profiles are inserted in one transaction. Usernames that already exist
+are skipped, so re-running an interrupted import is safe; ``start`` skips
+records that an earlier run already committed.
+"""
+
+import csv
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from . import provisioning
+
+EMAIL_DOMAIN = "paycorp.local"
+FORMATS = ("csv", "ndjson")
+BATCH_SIZE = 1000
+FIELDS = ("username", "email", "password", "first_name", "last_name")
+
+Rejected = namedtuple("Rejected", ["number", "username", "reason"])
+
+
+class ImportResult:
+    def __init__(self, processed=0):
+        self.processed = processed
+        self.created = 0
+        self.skipped = 0
+        self.rejected = []
+
+
+def read_records(handle, fmt):
+    """Yield record dicts from an open text file."""
+    if fmt == "csv":
+        yield from csv.DictReader(handle)
+        return
+    for line in handle:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line  # rejected by _clean as not an object
+
+
+def _clean(number, record, seen):
+    """``(fields, None)`` for a usable record, else ``(None, Rejected)``."""
+    if not isinstance(record, dict):
+        return None, Rejected(number, "", "record is not an object")
+    values = {name: record.get(name) for name in FIELDS}
+    values = {name: "" if value is None else value for name, value in values.items()}
+    wrong = [name for name, value in values.items() if not isinstance(value, str)]
+    username = values["username"].strip() if "username" not in wrong else ""
+    email = values["email"].strip() if "email" not in wrong else ""
+
+    def reject(reason):
+        return None, Rejected(number, username, reason)
+
+    if wrong:
+        return reject(f"{', '.join(wrong)} must be text")
+    if not username:
+        return reject("missing username")
+    if len(username) > User._meta.get_field("username").max_length:
+        return reject("username is too long")
+    try:
+        User.username_validator(username)
+        validate_email(email)
+    except ValidationError as error:
+        return reject(error.messages[0])
+    if email.rsplit("@", 1)[1].lower() != EMAIL_DOMAIN:
+        return reject(f"email must be @{EMAIL_DOMAIN}")
+    if username in seen:
+        return reject("duplicate username in file")
+    seen.add(username)
+    return {
+        "username": username,
+        "email": email,
+        "password": values["password"] or None,
+        "first_name": values["first_name"].strip(),
+        "last_name": values["last_name"].strip(),
+    }, None
+
+
+def _setup_worker():
+    # Spawned (not forked) workers start without Django configured.
+    import django
+
+    django.setup()
+
+
+def _hash_all(passwords, pool, workers):
+    if pool is None:
+        return [make_password(password) for password in passwords]
+    # Unusable passwords need no hashing; keep them out of the pool.
+    to_hash = [password for password in passwords if password is not None]
+    chunk = max(1, len(to_hash) // (workers * 4))
+    hashed = iter(pool.map(make_password, to_hash, chunksize=chunk))
+    return [
+        next(hashed) if password is not None else make_password(None)
+        for password in passwords
+    ]
+
+
+def _import_batch(batch, result, seen, pool, workers):
+    fields = []
+    for number, record in batch:
+        cleaned, rejected = _clean(number, record, seen)
+        if rejected:
+            result.rejected.append(rejected)
+        else:
+            fields.append(cleaned)
+
+    existing = set(
+        User.objects.filter(
+            username__in=[row["username"] for row in fields]
+        ).values_list("username", flat=True)
+    )
+    fields = [row for row in fields if row["username"] not in existing]
+    passwords = _hash_all([row.pop("password") for row in fields], pool, workers)
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            User(password=password, **row) for row, password in zip(fields, passwords)
+        )
+        provisioning.provision_profiles(users)
+    result.created += len(users)
+    result.skipped += len(existing)
+    result.processed += len(batch)
+
+
+def import_users(records, batch_size=BATCH_SIZE, workers=None, start=0, progress=None):
+    """Import an iterable of record dicts; returns an ``ImportResult``.
+
+    ``workers=0`` hashes in this process; ``None`` uses one per CPU.
+    ``progress(result)`` is called after every committed batch, when
+    ``result.processed`` records are done.
+    """
+    result = ImportResult(processed=start)
+    numbered = islice(enumerate(records, 1), start, None)
+    seen = set()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = (
+        nullcontext()
+        if workers == 0
+        else ProcessPoolExecutor(workers, initializer=_setup_worker)
+    )
+    with pool as executor:
+        while batch := list(islice(numbered, batch_size)):
+            _import_batch(batch, result, seen, executor, workers)
+            if progress is not None:
+                progress(result)
+    return result
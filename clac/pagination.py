@@ -0,0 +1,127 @@
+import base64
+import json
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+Page = namedtuple("Page", ["items", "next_cursor"])
+
+
+class InvalidCursor(ValueError):
+    """A cursor token that is not one valid value per ordering field."""
+
+
+def _json_default(value):
+    # Full isoformat: DjangoJSONEncoder drops microseconds, which would make
+    # rows created within the same millisecond repeat across pages.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), default=_json_default).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, model, ordering):
+    """Values for ``ordering`` on ``model`` from an ``encode_cursor`` token.
+
+    None for a missing token. Anything else that does not decode to exactly
+    one valid value per field raises ``InvalidCursor``, so a crafted token
+    never reaches a filter.
+    """
+    if not token:
+        return None
+    values = _load(token)
+    if len(values) != len(ordering):
+        raise InvalidCursor(token)
+    cleaned = []
+    for name, value in zip(ordering, values):
+        field = model._meta.get_field(name.lstrip("-"))
+        try:
+            value = field.to_python(value)
+            if value is None:
+                raise ValidationError("null")
+            field.run_validators(value)
+        except (ValidationError, TypeError):
+            raise InvalidCursor(token) from None
+        cleaned.append(value)
+    return cleaned
+
+
+def _load(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise InvalidCursor(token) from None
+    if not isinstance(values, list):
+        raise InvalidCursor(token)
+    return values
+
+
+def clean_cursor(token, model, ordering):
+    """``token`` if it is a valid cursor for ``ordering``, else "".
+
+    Safe to use in cache keys: only cursors ``keyset_page`` would accept get
+    through, and those point at real key values.
+    """
+    try:
+        return token if decode_cursor(token, model, ordering) else ""
+    except InvalidCursor:
+        return ""
+
+
+def after(ordering, values):
+    """Q selecting rows strictly after ``values`` in ``ordering`` (keyset seek)."""
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        step = Q(**{f"{name}__{lookup}": values[i]})
+        for previous, value in zip(ordering[:i], values):
+            step &= Q(**{previous.lstrip("-"): value})
+        condition |= step
+    return condition
+
+
+def seek(queryset, ordering, cursor=None):
+    """``queryset`` ordered by ``ordering`` and positioned after ``cursor``.
+
+    Raises ``InvalidCursor`` for a token ``decode_cursor`` rejects.
+    """
+    values = decode_cursor(cursor, queryset.model, ordering)
+    queryset = queryset.order_by(*ordering)
+    if values is not None:
+        queryset = queryset.filter(after(ordering, values))
+    return queryset
+
+
+def cursor_for(item, ordering):
+    return encode_cursor(_key(item, field.lstrip("-")) for field in ordering)
+
+
+def keyset_page(queryset, ordering, cursor=None, size=50):
+    """One page of ``queryset`` ordered by ``ordering``, continuing from ``cursor``.
+
+    ``ordering`` must end in a unique field so every row has a distinct key.
+    An invalid ``cursor`` starts again from the first page.
+    """
+    try:
+        queryset = seek(queryset, ordering, cursor)
+    except InvalidCursor:
+        queryset = seek(queryset, ordering)
+    items = list(queryset[: size + 1])
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        next_cursor = cursor_for(items[-1], ordering)
+    return Page(items, next_cursor)
+
+
+def _key(item, name):
+    if isinstance(item, dict):
+        return item[name]
+    return getattr(item, name)
@@ -0,0 +1,147 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as DjangoTemplate
+
+logger = logging.getLogger("clac.perf")
+
+_current = ContextVar("clac_request_stats", default=None)
+
+
+class RequestStats:
+    """Query count and timings (in seconds) collected for one request."""
+
+    def __init__(self):
+        self.url_name = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.wall_time = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.2f}",
+                f"total;dur={self.wall_time * 1000:.2f}",
+            ]
+        )
+
+    def as_dict(self):
+        return {
+            "url_name": self.url_name,
+            "queries": self.queries,
+            "db_ms": round(self.db_time * 1000, 3),
+            "template_ms": round(self.template_time * 1000, 3),
+            "wall_ms": round(self.wall_time * 1000, 3),
+        }
+
+
+def current_stats():
+    return _current.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.record_query(execute, sql, params, many, context)
+
+
+def instrument_connections():
+    """Count this thread's queries towards whichever request is current.
+
+    Connections are per thread and async views query from a worker thread, so
+    this runs in the thread that will issue the queries. The wrapper stays
+    installed and does nothing outside a request.
+    """
+    for connection in connections.all():
+        if _record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_record_query)
+
+
+class PerformanceMiddleware:
+    """Record query count, DB time, template time and wall time per request.
+
+    The numbers are attached to the request as ``request.perf``, sent back in a
+    ``Server-Timing`` header and logged as JSON on the ``clac.perf`` logger.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token, started = self._start(request)
+        try:
+            instrument_connections()
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats, token, started = self._start(request)
+        try:
+            await sync_to_async(instrument_connections)()
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, started)
+
+    def _start(self, request):
+        stats = RequestStats()
+        request.perf = stats
+        return stats, _current.set(stats), time.perf_counter()
+
+    def _finish(self, request, response, stats, started):
+        stats.wall_time = time.perf_counter() - started
+        if request.resolver_match is not None:
+            stats.url_name = request.resolver_match.url_name
+        response["Server-Timing"] = stats.server_timing()
+        logger.info(json.dumps({"path": request.path, **stats.as_dict()}))
+        return response
+
+
+class TimedTemplate(DjangoTemplate):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats = current_stats()
+            if stats is not None:
+                stats.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that adds render time to the request stats.
+
+    Queries issued lazily from templates count towards both DB and template
+    time.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,50 @@
+"""The one place users get their Profile.
+
+``ensure_profile`` backs the ``post_save`` receiver and is idempotent, so a
+second caller finds the row instead of racing to insert it. Users created
+with ``bulk_create`` never send ``post_save``; ``provision_profiles`` gives
+them profiles with batched insert-or-ignore statements and ranks the new
+rows in one go.
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import ranking
+from .models import Profile
+
+
+def ensure_profile(user):
+    """The user's profile, created if it does not exist yet."""
+    if User.profile.is_cached(user):
+        return user.profile
+    profile, _ = Profile.objects.get_or_create(user=user)
+    return profile
+
+
+def provision_profiles(users, batch_size=1000):
+    """Create the missing profiles of ``users`` (instances or ids).
+
+    Returns the number of profiles created.
+    """
+    user_ids = [getattr(user, "pk", user) for user in users]
+    batches = [
+        user_ids[start : start + batch_size]
+        for start in range(0, len(user_ids), batch_size)
+    ]
+    with transaction.atomic():
+        for batch in batches:
+            Profile.objects.bulk_create(
+                [Profile(user_id=user_id) for user_id in batch],
+                ignore_conflicts=True,
+            )
+        # Ignored conflicts come back without ids; unranked rows are the new ones.
+        created = [
+            profile
+            for batch in batches
+            for profile in Profile.objects.filter(
+                user_id__in=batch, leaderboard__isnull=True
+            ).only("coins", "joined")
+        ]
+        ranking.place_many(created)
+    return len(created)
@@ -0,0 +1,263 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Q, Sum
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from . import fragments
+from .models import CoinBucket, LeaderboardEntry, Profile
+
+# Rows shown by the cached leaderboard fragments.
+FRAGMENT_SIZE = 10
+
+# Windowed rankings: label and length in days (None is all time). Windows roll
+# back from today rather than starting at calendar week or month boundaries.
+WINDOWS = {
+    "week": ("Last 7 days", 7),
+    "month": ("Last 30 days", 30),
+    "all": ("All time", None),
+}
+
+
+def place(profile):
+    """Insert or move ``profile`` to its rank, shifting only the rows in between.
+
+    The new rank comes from the nearest entry ahead of ``profile``, one seek on
+    the ``(-coins, joined)`` index. Ranks are dense, so the UPDATE that follows
+    rewrites every row the profile passes: a move of k places costs k row
+    writes. Approvals usually move a profile a few places; a jump from #40,000
+    to #100 rewrites ~40,000 rows.
+
+    ``select_for_update()`` is a no-op on SQLite; there concurrent placements
+    are serialised by the write lock the tuned profile takes at BEGIN
+    IMMEDIATE.
+    """
+    with transaction.atomic():
+        entry = (
+            LeaderboardEntry.objects.select_for_update()
+            .filter(profile_id=profile.pk)
+            .first()
+        )
+        if (
+            entry is not None
+            and entry.coins == profile.coins
+            and entry.joined == profile.joined
+        ):
+            return entry.rank
+
+        # Ranks of the other entries still reflect the old order, so the entry
+        # just ahead says where the profile lands relative to its old place.
+        ahead = _rank_ahead_of(profile)
+        if entry is None or ahead < entry.rank:
+            rank = ahead + 1
+        else:
+            rank = ahead
+        stamp = timezone.now()
+        others = LeaderboardEntry.objects.exclude(profile_id=profile.pk)
+        if entry is None:
+            others.filter(rank__gte=rank).update(rank=F("rank") + 1, updated_at=stamp)
+        elif rank < entry.rank:
+            others.filter(rank__gte=rank, rank__lt=entry.rank).update(
+                rank=F("rank") + 1, updated_at=stamp
+            )
+        elif rank > entry.rank:
+            others.filter(rank__gt=entry.rank, rank__lte=rank).update(
+                rank=F("rank") - 1, updated_at=stamp
+            )
+
+        LeaderboardEntry.objects.update_or_create(
+            profile_id=profile.pk,
+            defaults={
+                "rank": rank,
+                "coins": profile.coins,
+                "joined": profile.joined,
+                "updated_at": stamp,
+            },
+        )
+        if min(rank, entry.rank if entry else rank) <= FRAGMENT_SIZE:
+            fragments.invalidate("leaderboard")
+        return rank
+
+
+def _rank_ahead_of(profile):
+    """Current rank of the entry just ahead of ``profile``; 0 if there is none."""
+    others = LeaderboardEntry.objects.exclude(profile_id=profile.pk)
+    tied = others.filter(coins=profile.coins).filter(
+        Q(joined__lt=profile.joined) | Q(joined=profile.joined, pk__lt=profile.pk)
+    )
+    for candidates in (
+        tied.order_by("-joined", "-pk"),
+        others.filter(coins__gt=profile.coins).order_by("coins", "-joined", "-pk"),
+    ):
+        rank = candidates.values_list("rank", flat=True).first()
+        if rank is not None:
+            return rank
+    return 0
+
+
+def place_many(profiles):
+    """Rank a batch of profiles that have no entry yet.
+
+    New profiles normally sort after everyone already ranked (no coins, the
+    latest join dates) and are appended in one INSERT; if any would land
+    higher, the board is rebuilt instead.
+    """
+    if not profiles:
+        return
+    profiles = sorted(profiles, key=lambda p: (-p.coins, p.joined, p.pk))
+    with transaction.atomic():
+        last = LeaderboardEntry.objects.select_for_update().order_by("-rank").first()
+        first = profiles[0]
+        if last is not None and (-first.coins, first.joined) < (
+            -last.coins,
+            last.joined,
+        ):
+            rebuild()
+            return
+        start = last.rank if last is not None else 0
+        stamp = timezone.now()
+        LeaderboardEntry.objects.bulk_create(
+            (
+                LeaderboardEntry(
+                    profile_id=profile.pk,
+                    rank=rank,
+                    coins=profile.coins,
+                    joined=profile.joined,
+                    updated_at=stamp,
+                )
+                for rank, profile in enumerate(profiles, start + 1)
+            ),
+            batch_size=1000,
+        )
+        if start < FRAGMENT_SIZE:
+            fragments.invalidate("leaderboard")
+
+
+def remove(profile):
+    """Close the gap left by a profile that is about to be deleted."""
+    rank = rank_of(profile)
+    if rank is not None:
+        LeaderboardEntry.objects.filter(rank__gt=rank).update(
+            rank=F("rank") - 1, updated_at=timezone.now()
+        )
+        if rank <= FRAGMENT_SIZE:
+            fragments.invalidate("leaderboard")
+
+
+def rebuild():
+    """Recompute every rank from scratch; only needed after out-of-band edits."""
+    profiles = Profile.objects.order_by("-coins", "joined", "pk").values_list(
+        "pk", "coins", "joined"
+    )
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(
+            (
+                LeaderboardEntry(profile_id=pk, rank=rank, coins=coins, joined=joined)
+                for rank, (pk, coins, joined) in enumerate(profiles.iterator(), 1)
+            ),
+            batch_size=1000,
+        )
+        fragments.invalidate("leaderboard")
+
+
+def top(n=10):
+    return (
+        Profile.objects.select_related("user")
+        .filter(leaderboard__rank__lte=n)
+        .order_by("leaderboard__rank")
+    )
+
+
+def last_changed(n=FRAGMENT_SIZE):
+    """When any of the top ``n`` rows last moved; None for an empty board."""
+    return LeaderboardEntry.objects.filter(rank__lte=n).aggregate(
+        stamp=Max("updated_at")
+    )["stamp"]
+
+
+async def alast_changed(n=FRAGMENT_SIZE):
+    stamps = await LeaderboardEntry.objects.filter(rank__lte=n).aaggregate(
+        stamp=Max("updated_at")
+    )
+    return stamps["stamp"]
+
+
+def rank_of(profile):
+    return (
+        LeaderboardEntry.objects.filter(profile_id=profile.pk)
+        .values_list("rank", flat=True)
+        .first()
+    )
+
+
+def rank_of_user(user):
+    return (
+        LeaderboardEntry.objects.filter(profile__user_id=user.pk)
+        .values_list("rank", flat=True)
+        .first()
+    )
+
+
+def total():
+    # Ranks are dense, so the highest rank is the number of ranked profiles.
+    return LeaderboardEntry.objects.aggregate(total=Max("rank"))["total"] or 0
+
+
+def neighbours(rank, radius=5):
+    """Entries within ``radius`` places of ``rank``, best first."""
+    return (
+        LeaderboardEntry.objects.select_related("profile__user")
+        .filter(rank__gte=max(rank - radius, 1), rank__lte=rank + radius)
+        .order_by("rank")
+    )
+
+
+def add_to_bucket(profile_id, coins, when=None):
+    """Add awarded coins to the profile's bucket for the day of ``when``."""
+    if not coins:
+        return
+    day = timezone.localdate(when)
+    buckets = CoinBucket.objects.filter(profile_id=profile_id, day=day)
+    with transaction.atomic():
+        if not buckets.update(coins=F("coins") + coins):
+            try:
+                with transaction.atomic():
+                    CoinBucket.objects.create(
+                        profile_id=profile_id, day=day, coins=coins
+                    )
+            except IntegrityError:
+                buckets.update(coins=F("coins") + coins)
+    fragments.invalidate("windows")
+
+
+def top_for_window(window, n=10):
+    """Top ``n`` profiles by coins earned in a window, each with ``.score``.
+
+    Windowed totals only read the buckets for the days in the window. Like a
+    queryset, the result is lazy so a cached fragment costs no queries.
+    """
+    days = WINDOWS[window][1]
+    if days is None:
+        return top(n).annotate(score=F("coins"))
+    start = timezone.localdate() - timedelta(days=days - 1)
+    return SimpleLazyObject(lambda: _window_top(start, n))
+
+
+def _window_top(start, n):
+    totals = list(
+        CoinBucket.objects.filter(day__gte=start)
+        .values("profile_id")
+        .annotate(score=Sum("coins"))
+        .order_by("-score", "profile__joined", "profile_id")[:n]
+    )
+    profiles = Profile.objects.select_related("user").in_bulk(
+        [row["profile_id"] for row in totals]
+    )
+    ranked = []
+    for row in totals:
+        profile = profiles[row["profile_id"]]
+        profile.score = row["score"]
+        ranked.append(profile)
+    return ranked
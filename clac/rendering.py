@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+
+import markdown2
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+
+MARKDOWN_EXTRAS = ["fenced-code-blocks", "code-friendly", "highlightjs-lang"]
+
+
+def render_markdown(body_md):
+    return markdown2.markdown(body_md, extras=MARKDOWN_EXTRAS)
+
+
+def body_hash(body_md):
+    """Content hash of the markdown source plus the extras it is rendered with."""
+    digest = hashlib.sha256()
+    digest.update("\0".join(MARKDOWN_EXTRAS).encode())
+    digest.update(b"\0")
+    digest.update(body_md.encode())
+    return digest.hexdigest()
+
+
+def _cache():
+    """The configured cache backend, or None when the persisted column is used."""
+    alias = getattr(settings, "MARKDOWN_RENDER_CACHE", "column")
+    if alias == "column":
+        return None
+    return caches[alias]
+
+
+def uses_cache():
+    return _cache() is not None
+
+
+def _cache_key(showcase_id, digest):
+    return f"showcase-html:{showcase_id}:{digest}"
+
+
+def refresh_body_html(showcase):
+    """Bring the stored HTML in line with ``body_md`` before a save.
+
+    Returns True when the persisted columns changed and need writing.
+    """
+    if _cache() is not None:
+        return False
+    digest = body_hash(showcase.body_md)
+    if showcase.body_html_hash == digest:
+        return False
+    showcase.body_html = render_markdown(showcase.body_md)
+    showcase.body_html_hash = digest
+    return True
+
+
+def warm_body_html(showcase):
+    """Fill the cache backend after a save; a no-op in column mode."""
+    cache = _cache()
+    if cache is None:
+        return
+    key = _cache_key(showcase.pk, body_hash(showcase.body_md))
+    if key not in cache:
+        cache.set(key, render_markdown(showcase.body_md))
+
+
+def _new_stamps():
+    # The HTTP validators in clac.conditional come from these two columns, so
+    # every write of new HTML has to move them too.
+    return {"version": F("version") + 1, "updated_at": timezone.now()}
+
+
+def get_body_html(showcase):
+    digest = body_hash(showcase.body_md)
+    cache = _cache()
+    if cache is None:
+        if showcase.body_html_hash == digest:
+            return showcase.body_html
+        html = render_markdown(showcase.body_md)
+        type(showcase).objects.filter(pk=showcase.pk).update(
+            body_html=html, body_html_hash=digest, **_new_stamps()
+        )
+        return html
+
+    key = _cache_key(showcase.pk, digest)
+    html = cache.get(key)
+    if html is None:
+        html = render_markdown(showcase.body_md)
+        cache.set(key, html)
+    return html
+
+
+async def aget_body_html(showcase):
+    """``get_body_html`` for async views; markdown renders in the default executor."""
+    digest = body_hash(showcase.body_md)
+    cache = _cache()
+    loop = asyncio.get_running_loop()
+    if cache is None:
+        if showcase.body_html_hash == digest:
+            return showcase.body_html
+        html = await loop.run_in_executor(None, render_markdown, showcase.body_md)
+        await type(showcase).objects.filter(pk=showcase.pk).aupdate(
+            body_html=html, body_html_hash=digest, **_new_stamps()
+        )
+        return html
+
+    key = _cache_key(showcase.pk, digest)
+    html = await cache.aget(key)
+    if html is None:
+        html = await loop.run_in_executor(None, render_markdown, showcase.body_md)
+        await cache.aset(key, html)
+    return html
+
+
+def rerender_batch(showcases):
+    """Re-render a batch of showcases unconditionally, in one write.
+
+    ``version`` and ``updated_at`` move too, so clients revalidating with an
+    old ETag get the new HTML.
+    """
+    if not showcases:
+        return
+    model = type(showcases[0])
+    cache = _cache()
+    if cache is None:
+        stamps = _new_stamps()
+        for showcase in showcases:
+            showcase.body_html = render_markdown(showcase.body_md)
+            showcase.body_html_hash = body_hash(showcase.body_md)
+            for name, value in stamps.items():
+                setattr(showcase, name, value)
+        model.objects.bulk_update(showcases, ["body_html", "body_html_hash", *stamps])
+    else:
+        cache.set_many(
+            {
+                _cache_key(s.pk, body_hash(s.body_md)): render_markdown(s.body_md)
+                for s in showcases
+            }
+        )
+        model.objects.filter(pk__in=[s.pk for s in showcases]).update(**_new_stamps())
@@ -0,0 +1,157 @@
+"""Full-text search over showcase titles and bodies.
+
+The engine is chosen with the ``SEARCH_BACKEND`` setting (a dotted path).
+``SQLiteFTSBackend`` keeps an FTS5 table keyed by showcase id; only the text
+lives in the index, and approval/owner filters join back to the showcase
+table so moderation never has to touch it. ``DatabaseBackend`` is a plain
+``icontains`` fallback for databases without a full-text engine.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from .models import Showcase
+
+SearchHit = namedtuple("SearchHit", ["showcase_id", "title", "snippet", "score"])
+
+FTS_TABLE = "clac_showcase_fts"
+# Control characters that cannot appear in submitted text mark highlights
+# until the snippet has been escaped.
+_OPEN, _CLOSE = "\x02", "\x03"
+
+
+def _highlight(text):
+    """Escape FTS output and turn its markers into <mark> tags."""
+    return mark_safe(escape(text).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>"))
+
+
+class SearchBackend(ABC):
+    @abstractmethod
+    def index(self, showcases):
+        """Add or refresh showcases (needs ``id``, ``title`` and ``body_md``)."""
+
+    @abstractmethod
+    def remove(self, ids):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def search(self, query, approved_only=True, owner_id=None, limit=20, offset=0):
+        """Best matches first, as a list of ``SearchHit``."""
+
+
+class SQLiteFTSBackend(SearchBackend):
+    @staticmethod
+    def match_expression(query):
+        # Quote every word so user input can never be parsed as FTS5 syntax;
+        # the last word also matches as a prefix for search-as-you-type.
+        words = re.findall(r"\w+", query)
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def index(self, showcases):
+        rows = [(s.id, s.title, s.body_md) for s in showcases]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows]
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    def search(self, query, approved_only=True, owner_id=None, limit=20, offset=0):
+        expression = self.match_expression(query)
+        if expression is None:
+            return []
+        filters = []
+        params = [_OPEN, _CLOSE, _OPEN, _CLOSE, expression]
+        if approved_only:
+            filters.append("AND s.approved")
+        if owner_id is not None:
+            filters.append("AND s.owner_id = %s")
+            params.append(owner_id)
+        params += [limit, offset]
+        # bm25 weights: a title match counts ten times a body match.
+        sql = f"""
+            SELECT f.rowid,
+                   highlight({FTS_TABLE}, 0, %s, %s),
+                   snippet({FTS_TABLE}, 1, %s, %s, '…', 16),
+                   bm25({FTS_TABLE}, 10.0, 1.0) AS score
+            FROM {FTS_TABLE} AS f
+            JOIN {Showcase._meta.db_table} AS s ON s.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s {" ".join(filters)}
+            ORDER BY score
+            LIMIT %s OFFSET %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [
+                SearchHit(pk, _highlight(title), _highlight(snippet), -score)
+                for pk, title, snippet, score in cursor.fetchall()
+            ]
+
+
+class DatabaseBackend(SearchBackend):
+    """Unindexed fallback: substring matches straight against the table."""
+
+    def index(self, showcases):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, approved_only=True, owner_id=None, limit=20, offset=0):
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        showcases = Showcase.objects.only("id", "title", "body_md")
+        for word in words:
+            showcases = showcases.filter(
+                Q(title__icontains=word) | Q(body_md__icontains=word)
+            )
+        if approved_only:
+            showcases = showcases.filter(approved=True)
+        if owner_id is not None:
+            showcases = showcases.filter(owner_id=owner_id)
+        return [
+            SearchHit(s.id, escape(s.title), escape(Truncator(s.body_md).words(30)), 0)
+            for s in showcases.order_by("-created_at")[offset : offset + limit]
+        ]
+
+
+@lru_cache
+def get_backend():
+    path = getattr(settings, "SEARCH_BACKEND", "clac.search.SQLiteFTSBackend")
+    return import_string(path)()
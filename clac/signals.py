@@ -1,11 +1,100 @@
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-from .models import Profile
+from . import auth, counters, fragments, jobs, provisioning, ranking, rendering, search
+from .models import Profile, ScreenshotBlob, Showcase
 
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        Profile.objects.create(user=instance)
+        provisioning.ensure_profile(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    auth.forget(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def forget_cached_profile(sender, instance, **kwargs):
+    auth.forget(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def place_on_leaderboard(sender, instance, update_fields, **kwargs):
+    if update_fields is None or {"coins", "joined"} & set(update_fields):
+        ranking.place(instance)
+
+
+@receiver(pre_delete, sender=Profile)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    ranking.remove(instance)
+
+
+@receiver(post_delete, sender=Showcase)
+def release_screenshot(sender, instance, **kwargs):
+    if "screenshot" not in instance.get_deferred_fields():
+        ScreenshotBlob.objects.release(instance.screenshot.name)
+
+
+@receiver(post_save, sender=Showcase)
+def count_submitted_showcase(sender, instance, created, **kwargs):
+    if created:
+        counters.shift(
+            instance.owner_id,
+            user_id=_owner_user_id(instance),
+            **counters.contribution(instance),
+        )
+
+
+@receiver(post_delete, sender=Showcase)
+def uncount_deleted_showcase(sender, instance, **kwargs):
+    if {"approved", "rejected", "coins_award"} & instance.get_deferred_fields():
+        return  # recount_showcases picks these up
+    deltas = counters.contribution(instance)
+    counters.shift(
+        instance.owner_id,
+        user_id=_owner_user_id(instance),
+        **{name: -delta for name, delta in deltas.items()},
+    )
+
+
+def _owner_user_id(showcase):
+    if Showcase.owner.is_cached(showcase):
+        return showcase.owner.user_id
+    return None
+
+
+@receiver(post_save, sender=Showcase)
+@receiver(post_delete, sender=Showcase)
+def invalidate_showcase_fragments(sender, instance, **kwargs):
+    fragments.invalidate("showcases", instance.owner_id)
+
+
+@receiver(post_save, sender=Showcase)
+def index_showcase(sender, instance, update_fields, **kwargs):
+    if update_fields is None or {"title", "body_md"} & set(update_fields):
+        search.get_backend().index([instance])
+
+
+@receiver(post_delete, sender=Showcase)
+def unindex_showcase(sender, instance, **kwargs):
+    search.get_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Showcase)
+def queue_showcase_followups(sender, instance, update_fields, **kwargs):
+    deferred = instance.get_deferred_fields()
+    if update_fields is None or "body_md" in update_fields:
+        if rendering.uses_cache():
+            jobs.warm_showcase_html.enqueue(instance.pk)
+    if (
+        not {"screenshot", "screenshot_digest"} & deferred
+        and instance.screenshot
+        and not instance.screenshot_digest
+    ):
+        jobs.build_screenshot_derivatives.enqueue(instance.pk)
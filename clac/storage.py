@@ -0,0 +1,64 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage, storages
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that keeps each distinct upload once, named by its SHA-256.
+
+    ``screens/shot.png`` is saved as ``screens/<ab>/<sha256>.png``; saving the
+    same bytes again returns the existing name without writing a second copy.
+    The digest is computed while the upload is streamed to disk.
+
+    Files under a ``derived/`` directory are already addressed by their
+    original's digest (see ``clac.images``) and keep the name they are given.
+    """
+
+    derived_dir = "derived"
+
+    def is_derived(self, name):
+        return self.derived_dir in name.split("/")
+
+    def get_available_name(self, name, max_length=None):
+        if self.is_derived(name):
+            return super().get_available_name(name, max_length)
+        # The final name is only known once the content is hashed in _save.
+        return name
+
+    def _save(self, name, content):
+        if self.is_derived(name):
+            return super()._save(name, content)
+
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        os.makedirs(self.path(directory or "."), exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.path(directory or "."))
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            final_name = posixpath.join(directory, hexdigest[:2], hexdigest + extension)
+            if self.exists(final_name):
+                return final_name
+            os.makedirs(os.path.dirname(self.path(final_name)), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, self.path(final_name))
+            return final_name
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def screenshot_storage():
+    return storages["screenshots"]
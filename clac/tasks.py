@@ -0,0 +1,210 @@
+"""A small database-backed task queue.
+
+Functions decorated with ``@task`` can be queued with ``.enqueue(*args)``;
+the call is stored as a ``Task`` row in the caller's transaction, so work is
+only picked up if the change that queued it commits. ``manage.py run_tasks``
+claims ready rows by priority and runs them in a thread pool, retrying
+failures with exponential backoff. With ``CLAC_TASKS_EAGER`` set, enqueued
+calls run in-process instead, once the caller's transaction commits (or
+straight away outside one), which is what tests and local setups without a
+worker want. Arguments must be JSON-serializable.
+"""
+
+import logging
+import random
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, priority, max_attempts):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def enqueue(self, *args, priority=None, delay=None):
+        """Queue ``func(*args)``; returns the Task, or None when run eagerly."""
+        if getattr(settings, "CLAC_TASKS_EAGER", False):
+            # Like a queued row, an eager call never sees a rolled-back change.
+            transaction.on_commit(partial(self.func, *args))
+            return None
+        return Task.objects.create(
+            name=self.name,
+            args=list(args),
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_after=timezone.now() + (delay or timedelta()),
+        )
+
+    def enqueue_many(self, calls):
+        """Queue one call per argument tuple in ``calls`` with a single INSERT."""
+        calls = [list(args) for args in calls]
+        if getattr(settings, "CLAC_TASKS_EAGER", False):
+            for args in calls:
+                transaction.on_commit(partial(self.func, *args))
+            return []
+        now = timezone.now()
+        return Task.objects.bulk_create(
+            Task(
+                name=self.name,
+                args=args,
+                priority=self.priority,
+                max_attempts=self.max_attempts,
+                run_after=now,
+            )
+            for args in calls
+        )
+
+
+def task(func=None, *, priority=0, max_attempts=5):
+    """Register a function as a task; higher ``priority`` runs first."""
+
+    def register(func):
+        wrapped = TaskFunction(func, priority, max_attempts)
+        registry[wrapped.name] = wrapped
+        return wrapped
+
+    return register(func) if func is not None else register
+
+
+def backoff(attempts):
+    """Delay before retry number ``attempts``: doubling, capped, jittered."""
+    base = getattr(settings, "CLAC_TASKS_BACKOFF", 5)
+    cap = getattr(settings, "CLAC_TASKS_BACKOFF_MAX", 3600)
+    delay = min(base * 2 ** (attempts - 1), cap)
+    return timedelta(seconds=delay * random.uniform(1.0, 1.1))
+
+
+def claim(worker, limit=1):
+    """Mark up to ``limit`` ready tasks as running for ``worker`` and return them.
+
+    Each row is taken with a conditional UPDATE, so two workers polling the
+    same table never run the same task.
+    """
+    now = timezone.now()
+    candidates = (
+        Task.objects.filter(status=Task.QUEUED, run_after__lte=now)
+        .order_by("-priority", "run_after", "id")
+        .values_list("id", flat=True)[: limit * 2]
+    )
+    claimed = []
+    for task_id in candidates:
+        taken = Task.objects.filter(pk=task_id, status=Task.QUEUED).update(
+            status=Task.RUNNING,
+            worker=worker,
+            started_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if taken:
+            claimed.append(task_id)
+            if len(claimed) == limit:
+                break
+    return list(Task.objects.filter(pk__in=claimed).order_by("-priority", "id"))
+
+
+def execute(task_row):
+    """Run a claimed task and record the outcome."""
+    function = registry.get(task_row.name)
+    try:
+        if function is None:
+            raise LookupError(f"No task registered as {task_row.name!r}")
+        function(*task_row.args)
+    except Exception:
+        error = traceback.format_exc()
+        if task_row.attempts >= task_row.max_attempts or function is None:
+            logger.error("Task %s (%s) failed: %s", task_row.pk, task_row.name, error)
+            Task.objects.filter(pk=task_row.pk).update(
+                status=Task.FAILED, finished_at=timezone.now(), last_error=error
+            )
+        else:
+            logger.warning("Task %s (%s) will retry", task_row.pk, task_row.name)
+            Task.objects.filter(pk=task_row.pk).update(
+                status=Task.QUEUED,
+                run_after=timezone.now() + backoff(task_row.attempts),
+                last_error=error,
+            )
+        return False
+    Task.objects.filter(pk=task_row.pk).update(
+        status=Task.DONE, finished_at=timezone.now()
+    )
+    return True
+
+
+def requeue_stale(timeout):
+    """Put back tasks left running longer than ``timeout`` by a dead worker."""
+    return Task.objects.filter(
+        status=Task.RUNNING, started_at__lt=timezone.now() - timeout
+    ).update(status=Task.QUEUED, worker="")
+
+
+def _run_in_thread(task_row):
+    try:
+        return execute(task_row)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    """Polls for ready tasks and runs up to ``concurrency`` of them at once."""
+
+    def __init__(self, concurrency=4, poll_interval=1.0, name=None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{threading.get_native_id()}"
+        self.stopping = threading.Event()
+
+    def run(self, burst=False):
+        """Process tasks until stopped; with ``burst``, until none are ready."""
+        processed = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while not self.stopping.is_set():
+                free = self.concurrency - len(running)
+                if free:
+                    for task_row in claim(self.name, free):
+                        running.add(pool.submit(_run_in_thread, task_row))
+                if not running:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                done, running = wait(
+                    running, timeout=self.poll_interval, return_when=FIRST_COMPLETED
+                )
+                processed += len(done)
+            wait(running)
+        processed += len(running)
+        close_old_connections()
+        return processed
+
+    def stop(self):
+        self.stopping.set()
+
+
+def drain(worker_name="eager"):
+    """Run every ready task in this thread; returns how many ran."""
+    count = 0
+    while batch := claim(worker_name, 10):
+        for task_row in batch:
+            execute(task_row)
+            count += 1
+    return count
@@ -0,0 +1,43 @@
+from django import template
+
+from clac import fragments
+
+register = template.Library()
+
+
+class CacheFragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        vary_on = [expression.resolve(context) for expression in self.vary_on]
+        return fragments.get_or_render(
+            self.name, vary_on, lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def cachefragment(parser, token):
+    """Cache a block until its scope is invalidated by a model change.
+
+    Usage::
+
+        {% load fragment_cache %}
+        {% cachefragment showcases profile.id %} ... {% endcachefragment %}
+
+    The fragment name must be listed in ``clac.fragments.FRAGMENT_SCOPES``;
+    any further arguments are resolved and become part of the key.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    name = bits[1].strip("\"'")
+    if name not in fragments.FRAGMENT_SCOPES:
+        raise template.TemplateSyntaxError(f"Unknown cached fragment {name!r}.")
+    nodelist = parser.parse(("endcachefragment",))
+    parser.delete_first_token()
+    return CacheFragmentNode(
+        nodelist, name, [parser.compile_filter(bit) for bit in bits[2:]]
+    )
@@ -0,0 +1,97 @@
+from unittest import skipIf
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from . import counters
+from .models import Showcase
+from .provisioning import provision_profiles
+from .rendering import body_hash, render_markdown
+
+# The in-memory SQLite test database (lumin.settings_test) uses shared-cache
+# table locks, which concurrent writers hit immediately instead of waiting.
+requires_file_db = skipIf(
+    not settings.DATABASES["default"].get("TEST", {}).get("NAME"),
+    "needs a file-backed test database; run with --ds=lumin.settings",
+)
+
+
+def make_user(username, password=None, **fields):
+    """One user with its profile; ``password`` None means unusable."""
+    return User.objects.create_user(username, password=password, **fields)
+
+
+def make_users(count, prefix="user", password=None, **fields):
+    """``count`` users and their profiles in a few batched INSERTs.
+
+    Returned in creation order with ``profile`` already loaded.
+    """
+    hashed = make_password(password)
+    users = User.objects.bulk_create(
+        User(username=f"{prefix}{i}", password=hashed, **fields) for i in range(count)
+    )
+    provision_profiles(users)
+    return list(
+        User.objects.filter(pk__in=[user.pk for user in users])
+        .select_related("profile")
+        .order_by("pk")
+    )
+
+
+def make_showcases(owner, count, title="Showcase", body_md="Showcase body", **fields):
+    """``count`` showcases for ``owner`` in one INSERT, HTML pre-rendered.
+
+    ``bulk_create`` skips ``post_save``, so these are not in the search
+    index and no follow-up tasks are queued; the owner's counters are
+    shifted directly.
+    """
+    html, digest = render_markdown(body_md), body_hash(body_md)
+    showcases = Showcase.objects.bulk_create(
+        Showcase(
+            owner=owner,
+            title=f"{title} {i}",
+            body_md=body_md,
+            body_html=html,
+            body_html_hash=digest,
+            **fields,
+        )
+        for i in range(count)
+    )
+    if showcases:
+        deltas = counters.contribution(showcases[0])
+        counters.shift(
+            owner.pk,
+            user_id=owner.user_id,
+            **{name: delta * count for name, delta in deltas.items()},
+        )
+    return showcases
+
+
+class QueryBudgetMixin:
+    """TestCase mixin that holds views to a maximum number of SQL queries.
+
+    Declare budgets per URL name, then check responses from the test client::
+
+        query_budgets = {"leaderboard": 2}
+
+        def test_leaderboard(self):
+            self.assertWithinBudget(self.client.get(reverse("leaderboard")))
+
+    The count comes from ``clac.perf.PerformanceMiddleware`` and covers the
+    whole request, including session and user lookups.
+    """
+
+    query_budgets = {}
+
+    def assertWithinBudget(self, response):
+        stats = response.wsgi_request.perf
+        if stats.url_name not in self.query_budgets:
+            self.fail(f"No query budget declared for {stats.url_name!r}")
+        budget = self.query_budgets[stats.url_name]
+        if stats.queries > budget:
+            self.fail(
+                f"{stats.url_name} issued {stats.queries} queries, "
+                f"over its budget of {budget}"
+            )
+        return stats
@@ -1,47 +1,84 @@
+import asyncio
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
 from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core import mail
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.template import Template, TemplateSyntaxError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
-
+from PIL import Image
+
+from clac import (
+    api,
+    bench,
+    counters,
+    fragments,
+    images,
+    jobs,
+    ledger,
+    onboarding,
+    provisioning,
+    ranking,
+    search,
+    tasks,
+)
+from clac import auth as clac_auth
 from clac.forms import RegisterForm
-from clac.models import Profile, Showcase
+from clac.models import (
+    BalanceSnapshot,
+    CoinBucket,
+    CoinTransaction,
+    LeaderboardEntry,
+    Profile,
+    ScreenshotBlob,
+    Showcase,
+    Task,
+)
+from clac.moderation import approve_many, award_showcase, reject_many
+from clac.pagination import InvalidCursor, decode_cursor, encode_cursor
+from clac.rendering import body_hash
+from clac.testing import (
+    QueryBudgetMixin,
+    make_showcases,
+    make_user,
+    make_users,
+    requires_file_db,
+)
 
 
 class BaseShowcaseTest(TestCase):
-    def setUp(self):
-        User.objects.all().delete()
-        Profile.objects.all().delete()
-
-        self.client = Client()
-        self.admin = User.objects.create_user(
-            username="admin", password="adminpass", is_staff=True, is_superuser=True
-        )
-        self.dev = User.objects.create_user(
-            username="dev", password="devpass", email="dev@paycorp.local"
-        )
-        self.profile = Profile.objects.get(user=self.dev)
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin", "adminpass", is_staff=True, is_superuser=True)
+        cls.dev = make_user("dev", "devpass", email="dev@paycorp.local")
+        cls.profile = cls.dev.profile
 
 
 class ShowcaseApprovalTest(BaseShowcaseTest):
-    def setUp(self):
-        User.objects.all().delete()
-        Profile.objects.all().delete()
-        self.client = Client()
-
-        self.admin = User.objects.create_user(
-            username="admin", password="adminpass", is_staff=True, is_superuser=True
-        )
-
-        self.dev = User.objects.create_user(
-            username="dev", password="devpass", email="dev@paycorp.local"
-        )
-
-        self.profile = Profile.objects.get(user=self.dev)
-
-        self.showcase = Showcase.objects.create(
-            owner=self.profile,
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.showcase = Showcase.objects.create(
+            owner=cls.profile,
             title="Test Showcase",
             body_md="**Hello World**",
             approved=False,
@@ -70,23 +107,23 @@ class ShowcaseApprovalTest(BaseShowcaseTest):
         self.assertEqual(self.profile.coins, 200)
         self.assertEqual(self.profile.tier, "Contributor")
 
+    def test_bad_coin_values_are_rejected(self):
+        self.client.login(username="admin", password="adminpass")
+        url = reverse("approve_showcase", args=[self.showcase.id])
+        for coins in ("abc", "-5", ""):
+            response = self.client.post(url, {"coins": coins}, follow=True)
+            self.assertRedirects(response, reverse("review_queue"))
+            self.assertContains(response, "Coins must be a whole number")
+        self.showcase.refresh_from_db()
+        self.assertFalse(self.showcase.approved)
 
-class ShowcaseRejectionTest(BaseShowcaseTest):
-    def setUp(self):
-        self.client = Client()
-
-        self.admin = User.objects.create_user(
-            username="admin", password="adminpass", is_staff=True, is_superuser=True
-        )
-
-        self.dev = User.objects.create_user(
-            username="dev", password="devpass", email="dev@paycorp.local"
-        )
-
-        self.profile = Profile.objects.get(user=self.dev)
 
-        self.showcase = Showcase.objects.create(
-            owner=self.profile,
+class ShowcaseRejectionTest(BaseShowcaseTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.showcase = Showcase.objects.create(
+            owner=cls.profile,
             title="Unapproved Showcase",
             body_md="Something here...",
             approved=False,
@@ -111,28 +148,19 @@ class ShowcaseRejectionTest(BaseShowcaseTest):
         self.assertEqual(self.profile.coins, 0)
 
 
-class LeaderboardTest(BaseShowcaseTest):
-    def setUp(self):
-        self.client = Client()
-
+class LeaderboardTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
         # Create 3 users with different coins and join dates
-        self.u1 = User.objects.create_user(username="early_low", password="pass")
-        self.p1 = Profile.objects.get(user=self.u1)
-        self.p1.coins = 100
-        self.p1.joined = timezone.now() - timedelta(days=10)
-        self.p1.save()
-
-        self.u2 = User.objects.create_user(username="late_high", password="pass")
-        self.p2 = Profile.objects.get(user=self.u2)
-        self.p2.coins = 200
-        self.p2.joined = timezone.now()
-        self.p2.save()
-
-        self.u3 = User.objects.create_user(username="early_high", password="pass")
-        self.p3 = Profile.objects.get(user=self.u3)
-        self.p3.coins = 200
-        self.p3.joined = timezone.now() - timedelta(days=5)
-        self.p3.save()
+        for username, coins, age in [
+            ("early_low", 100, timedelta(days=10)),
+            ("late_high", 200, timedelta()),
+            ("early_high", 200, timedelta(days=5)),
+        ]:
+            profile = make_user(username).profile
+            profile.coins = coins
+            profile.joined = timezone.now() - age
+            profile.save()
 
     def test_leaderboard_sorting(self):
         response = self.client.get(reverse("leaderboard"))
@@ -148,20 +176,18 @@ class LeaderboardTest(BaseShowcaseTest):
 
 
 class ShowcaseMarkdownRenderingTest(BaseShowcaseTest):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="dev", password="pass")
-        self.profile = Profile.objects.get(user=self.user)
-
-        self.showcase = Showcase.objects.create(
-            owner=self.profile,
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.showcase = Showcase.objects.create(
+            owner=cls.profile,
             title="Markdown Test",
             body_md="**Bold Text**\n\n# Heading 1",
             approved=True,
         )
 
     def test_markdown_is_rendered_to_html(self):
-        self.client.login(username="dev", password="pass")
+        self.client.login(username="dev", password="devpass")
         url = reverse("showcase_detail", args=[self.showcase.id])
         response = self.client.get(url)
 
@@ -175,25 +201,24 @@ class ShowcaseMarkdownRenderingTest(BaseShowcaseTest):
 
 
 class ProfileViewTest(BaseShowcaseTest):
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username="vaish", password="testpass")
-        self.profile = Profile.objects.get(user=self.user)
-        self.profile.coins = 300
-        self.profile.update_tier()
-        self.profile.save()
-        self.dev_user = User.objects.create_user(username="dev", password="devpass")
-        self.dev_profile = Profile.objects.get(user=self.dev_user)
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = make_user("vaish", "testpass")
+        cls.vaish = cls.user.profile
+        cls.vaish.coins = 300
+        cls.vaish.update_tier()
+        cls.vaish.save()
 
         # Create a few showcases
         Showcase.objects.create(
-            owner=self.profile,
+            owner=cls.vaish,
             title="Showcase One",
             body_md="**Content One**",
             approved=True,
         )
         Showcase.objects.create(
-            owner=self.profile,
+            owner=cls.vaish,
             title="Showcase Two",
             body_md="# Heading Two",
             approved=True,
@@ -300,10 +325,6 @@ class TierAssignmentTest(BaseShowcaseTest):
 
 
 class ModerationAccessTest(BaseShowcaseTest):
-    def setUp(self):
-        self.client = Client()
-        self.dev = User.objects.create_user(username="dev", password="devpass")
-
     def test_non_admin_cannot_access_moderation(self):
         self.client.login(username="dev", password="devpass")
         response = self.client.get(reverse("moderation_dashboard"))
@@ -330,3 +351,1615 @@ class ProfileSignalTest(TestCase):
             Profile.objects.filter(user=user).exists(),
             "Profile not auto-created by signal",
         )
+
+
+class ShowcaseRenderCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("dev", "pass")
+        cls.profile = cls.user.profile
+        cls.showcase = Showcase.objects.create(
+            owner=cls.profile, title="Cached", body_md="**First**"
+        )
+
+    def test_html_is_rendered_on_save(self):
+        self.assertIn("<strong>First</strong>", self.showcase.body_html)
+
+        self.showcase.body_md = "*Second*"
+        self.showcase.save(update_fields=["body_md"])
+        self.showcase.refresh_from_db()
+        self.assertIn("<em>Second</em>", self.showcase.body_html)
+
+    def test_detail_view_does_not_rerender(self):
+        self.client.login(username="dev", password="pass")
+        url = reverse("showcase_detail", args=[self.showcase.id])
+        with mock.patch("clac.rendering.markdown2.markdown") as markdown:
+            response = self.client.get(url)
+        markdown.assert_not_called()
+        self.assertContains(response, "<strong>First</strong>")
+
+    def test_stale_html_is_rerendered_by_view(self):
+        Showcase.objects.filter(pk=self.showcase.pk).update(body_md="# Edited")
+        self.client.login(username="dev", password="pass")
+        response = self.client.get(reverse("showcase_detail", args=[self.showcase.id]))
+        self.assertContains(response, "<h1>Edited</h1>")
+
+    @override_settings(MARKDOWN_RENDER_CACHE="markdown", CLAC_TASKS_EAGER=True)
+    def test_cache_backend_mode(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            showcase = Showcase.objects.create(
+                owner=self.profile, title="Backend", body_md="`code`"
+            )
+        self.assertEqual(showcase.body_html, "")
+        self.client.login(username="dev", password="pass")
+        with mock.patch("clac.rendering.markdown2.markdown") as markdown:
+            response = self.client.get(reverse("showcase_detail", args=[showcase.id]))
+        markdown.assert_not_called()
+        self.assertContains(response, "<code>code</code>")
+
+    def test_rerender_command(self):
+        Showcase.objects.update(body_html="stale")
+        call_command("rerender_markdown", stdout=mock.MagicMock())
+        self.showcase.refresh_from_db()
+        self.assertIn("<strong>First</strong>", self.showcase.body_html)
+
+
+class RankingIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profiles = [user.profile for user in make_users(5, password="pass")]
+        for i, coins in enumerate([50, 300, 10, 300, 0]):
+            profile = cls.profiles[i]
+            profile.coins = coins
+            profile.joined = timezone.now() - timedelta(days=10 - i)
+            profile.save()
+
+    def assertRanksMatchFullSort(self):
+        expected = list(
+            Profile.objects.order_by("-coins", "joined", "pk").values_list(
+                "pk", flat=True
+            )
+        )
+        actual = list(
+            LeaderboardEntry.objects.order_by("rank").values_list(
+                "profile_id", flat=True
+            )
+        )
+        self.assertEqual(actual, expected)
+        self.assertEqual(
+            list(
+                LeaderboardEntry.objects.order_by("rank").values_list("rank", flat=True)
+            ),
+            list(range(1, len(expected) + 1)),
+        )
+
+    def test_rank_lookup_and_neighbours(self):
+        self.assertRanksMatchFullSort()
+        self.assertEqual(ranking.rank_of(self.profiles[1]), 1)
+        self.assertEqual(ranking.rank_of(self.profiles[4]), 5)
+        self.assertEqual(ranking.total(), 5)
+        around = [e.profile_id for e in ranking.neighbours(3, radius=1)]
+        self.assertEqual(
+            around, [self.profiles[3].pk, self.profiles[0].pk, self.profiles[2].pk]
+        )
+
+    def test_coin_changes_move_entries_in_place(self):
+        self.profiles[4].coins = 1000
+        self.profiles[4].save()
+        self.assertEqual(ranking.rank_of(self.profiles[4]), 1)
+        self.assertRanksMatchFullSort()
+
+        self.profiles[1].coins = 0
+        self.profiles[1].save()
+        self.assertRanksMatchFullSort()
+
+    def test_moves_through_ties_keep_ranks_dense(self):
+        for index, coins in [(2, 300), (0, 300), (3, 10), (2, 0), (4, 50), (1, 300)]:
+            self.profiles[index].coins = coins
+            self.profiles[index].save()
+            self.assertRanksMatchFullSort()
+
+    def test_place_seeks_instead_of_counting(self):
+        self.profiles[4].coins = 60
+        Profile.objects.filter(pk=self.profiles[4].pk).update(coins=60)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ranking.place(self.profiles[4]), 3)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries))
+        self.assertRanksMatchFullSort()
+
+    def test_deleting_a_profile_closes_the_gap(self):
+        self.profiles[3].user.delete()
+        self.assertEqual(ranking.total(), 4)
+        self.assertRanksMatchFullSort()
+
+    def test_rebuild_matches_incremental_ranks(self):
+        before = list(
+            LeaderboardEntry.objects.order_by("rank").values_list("profile_id", "rank")
+        )
+        ranking.rebuild()
+        after = list(
+            LeaderboardEntry.objects.order_by("rank").values_list("profile_id", "rank")
+        )
+        self.assertEqual(before, after)
+
+    def test_ranking_page_shows_own_position(self):
+        self.client.login(username="user0", password="pass")
+        response = self.client.get(reverse("ranking"))
+        self.assertContains(response, "You are <strong>#3</strong> of 5.")
+
+
+class AwardShowcaseTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("dev", "pass")
+        cls.profile = cls.user.profile
+        (cls.showcase,) = make_showcases(
+            cls.profile, 1, title="Award", body_md="Worth some coins"
+        )
+
+    def test_award_is_paid_once(self):
+        self.assertTrue(award_showcase(self.showcase.pk, 600))
+        self.assertFalse(award_showcase(self.showcase.pk, 600))
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.coins, 600)
+        self.assertEqual(self.profile.tier, "Innovator")
+        self.assertEqual(ranking.rank_of(self.profile), 1)
+
+    def test_award_issues_single_profile_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            award_showcase(self.showcase.pk, 50)
+        profile_writes = [
+            q["sql"] for q in queries if q["sql"].startswith('UPDATE "clac_profile"')
+        ]
+        self.assertEqual(len(profile_writes), 1)
+        self.assertIn("CASE WHEN", profile_writes[0])
+
+
+@requires_file_db
+class ConcurrentAwardTest(TransactionTestCase):
+    def test_parallel_approvals_against_one_profile(self):
+        user = User.objects.create_user(username="dev", password="pass")
+        showcases = [
+            Showcase.objects.create(
+                owner=user.profile, title=f"Parallel {i}", body_md="Concurrent body"
+            )
+            for i in range(8)
+        ]
+        # Every showcase is approved twice to exercise the idempotency guard.
+        targets = [s.pk for s in showcases] * 2
+        results = []
+        barrier = threading.Barrier(len(targets))
+
+        def approve(showcase_id):
+            try:
+                barrier.wait()
+                results.append(award_showcase(showcase_id, 100))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=approve, args=(pk,)) for pk in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), len(showcases))
+        profile = Profile.objects.get(user=user)
+        self.assertEqual(profile.coins, 100 * len(showcases))
+        self.assertEqual(profile.tier, "Innovator")
+
+
+class BulkModerationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin", "adminpass", is_staff=True)
+        cls.alice, cls.bob = (make_user(name).profile for name in ("alice", "bob"))
+        cls.showcases = [
+            *make_showcases(cls.alice, 2, title="S", body_md="Batch body"),
+            *make_showcases(cls.bob, 2, title="S", body_md="Batch body"),
+        ]
+
+    def test_approve_many_aggregates_per_profile(self):
+        already = self.showcases[3]
+        award_showcase(already.pk, 10)
+
+        result = approve_many(
+            [(self.showcases[0].pk, 60), (self.showcases[1].pk, 60)]
+            + [(self.showcases[2].pk, 5), (already.pk, 999), (12345, 1)]
+        )
+
+        self.assertEqual(result, (3, 2))
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.coins, self.alice.tier), (120, "Contributor"))
+        self.assertEqual(self.bob.coins, 15)
+        already.refresh_from_db()
+        self.assertEqual(already.coins_award, 10)
+
+    def test_reject_many_skips_approved(self):
+        award_showcase(self.showcases[0].pk, 10)
+        result = reject_many([(s.pk, "Off topic") for s in self.showcases])
+        self.assertEqual(result, (3, 1))
+        self.assertEqual(Showcase.objects.filter(admin_note="Off topic").count(), 3)
+
+    def test_bulk_endpoint_reports_summary(self):
+        self.client.login(username="admin", password="adminpass")
+        data = {
+            "action": "approve",
+            "selected": [s.pk for s in self.showcases[:3]],
+            f"coins-{self.showcases[0].pk}": "40",
+            f"coins-{self.showcases[1].pk}": "60",
+        }
+        response = self.client.post(reverse("bulk_moderate"), data, follow=True)
+        self.assertContains(response, "Approved 2 showcases, skipped 1.")
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.coins, 100)
+
+    def test_row_button_moderates_single_showcase(self):
+        self.client.login(username="admin", password="adminpass")
+        target = self.showcases[2]
+        self.client.post(
+            reverse("bulk_moderate"),
+            {"action": f"reject-{target.pk}", f"reason-{target.pk}": "Duplicate"},
+        )
+        target.refresh_from_db()
+        self.assertEqual(target.admin_note, "Duplicate")
+
+
+class ReviewQueuePaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin", "adminpass", is_staff=True)
+        owners = [user.profile for user in make_users(3, prefix="dev")]
+        cls.showcases = [
+            Showcase.objects.create(
+                owner=owners[i % 3], title=f"Queued {i}", body_md="Queue body"
+            )
+            for i in range(7)
+        ]
+
+    def setUp(self):
+        self.client.login(username="admin", password="adminpass")
+
+    @mock.patch("clac.views.REVIEW_PAGE_SIZE", 3)
+    def test_pages_follow_the_cursor(self):
+        seen = []
+        cursor = ""
+        # The session comes from the cache; the user is read once, then cached.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("review_queue"))
+        while True:
+            seen.extend(s.pk for s in response.context["pending"])
+            cursor = response.context["next_cursor"]
+            if not cursor:
+                break
+            response = self.client.get(reverse("review_queue"), {"cursor": cursor})
+        self.assertEqual(seen, [s.pk for s in self.showcases])
+
+    def test_crafted_cursors_are_rejected(self):
+        ordering = ("created_at", "id")
+        for values in (["x", "y"], [{"a": 1}, 2], [None, 1], ["2024-01-01"]):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(encode_cursor(values), Showcase, ordering)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not a cursor", Showcase, ordering)
+
+    def test_crafted_cursor_restarts_from_first_page(self):
+        for values in (["x", "y"], [{"a": 1}, 2]):
+            response = self.client.get(
+                reverse("review_queue"), {"cursor": encode_cursor(values)}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context["pending"][0], self.showcases[0])
+
+    def test_rejected_showcases_leave_the_queue(self):
+        target = self.showcases[0]
+        self.client.post(
+            reverse("reject_showcase", args=[target.pk]), {"reason": "Spam"}
+        )
+        response = self.client.get(reverse("review_queue"))
+        self.assertNotIn(target, response.context["pending"])
+        target.refresh_from_db()
+        self.assertTrue(target.rejected)
+        self.assertFalse(award_showcase(target.pk, 100))
+
+    def test_missing_reason_redirects_back_to_queue(self):
+        response = self.client.post(
+            reverse("reject_showcase", args=[self.showcases[0].pk]), {"reason": ""}
+        )
+        self.assertRedirects(response, reverse("review_queue"))
+
+
+def make_image(size=(2000, 1500), fmt="PNG", name="shot.png"):
+    buffer = BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(CLAC_TASKS_EAGER=True)
+class ScreenshotDerivativeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_user("dev").profile
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_derivatives_are_built_on_upload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            showcase = Showcase.objects.create(
+                owner=self.profile,
+                title="With image",
+                body_md="Has a screenshot",
+                screenshot=make_image(),
+            )
+        # Built by a queued task, which works on its own copy of the row.
+        showcase.refresh_from_db()
+        self.assertEqual(len(showcase.screenshot_digest), 64)
+        storage = showcase.screenshot.storage
+        for size, box in images.DERIVATIVE_SIZES.items():
+            name = images.derivative_name(
+                showcase.screenshot.name, showcase.screenshot_digest, size
+            )
+            self.assertTrue(storage.exists(name))
+            with storage.open(name) as fh, Image.open(fh) as derivative:
+                self.assertLessEqual(derivative.width, box[0])
+                self.assertLessEqual(derivative.height, box[1])
+        self.assertTrue(showcase.thumb_url.endswith("/thumb.webp"))
+        self.assertIn(showcase.screenshot_digest, showcase.thumb_url)
+
+    def test_backfill_command_builds_missing_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            showcase = Showcase.objects.create(
+                owner=self.profile,
+                title="Legacy",
+                body_md="Uploaded before derivatives",
+                screenshot=make_image(),
+            )
+        derived = images.derivative_name(
+            showcase.screenshot.name, showcase.screenshot_digest, "thumb"
+        )
+        shutil.rmtree(os.path.join(self.media_root, os.path.dirname(derived)))
+        Showcase.objects.update(screenshot_digest="")
+
+        call_command("build_derivatives", stdout=mock.MagicMock())
+
+        showcase.refresh_from_db()
+        name = images.derivative_name(
+            showcase.screenshot.name, showcase.screenshot_digest, "card"
+        )
+        self.assertTrue(showcase.screenshot.storage.exists(name))
+
+
+class CappedUploadTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_user("dev", "devpass")
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.login(username="dev", password="devpass")
+
+    def post_showcase(self, screenshot):
+        return self.client.post(
+            reverse("add_showcase"),
+            {
+                "title": "Upload",
+                "body_md": "A showcase with a screenshot",
+                "email": "dev@paycorp.local",
+                "screenshot": screenshot,
+            },
+        )
+
+    def test_image_within_limits_is_accepted(self):
+        response = self.post_showcase(make_image(size=(640, 480)))
+        self.assertRedirects(response, reverse("dashboard"))
+        self.assertTrue(Showcase.objects.get(title="Upload").screenshot)
+
+    @override_settings(SCREENSHOT_MAX_PIXELS=1_000_000)
+    def test_too_many_pixels_is_rejected_from_the_header(self):
+        with mock.patch("clac.images.build_derivatives") as build:
+            response = self.post_showcase(make_image(size=(3000, 3000)))
+        self.assertFormError(
+            response.context["form"],
+            "screenshot",
+            "Image is too large (3000x3000 pixels); the limit is 1,000,000 pixels.",
+        )
+        build.assert_not_called()
+        self.assertFalse(Showcase.objects.exists())
+
+    @override_settings(SCREENSHOT_MAX_BYTES=1024)
+    def test_oversized_file_is_rejected_while_streaming(self):
+        response = self.post_showcase(
+            SimpleUploadedFile("big.png", b"\x89PNG" + b"0" * 4096)
+        )
+        self.assertFormError(
+            response.context["form"], "screenshot", "File is larger than 1.0\xa0KB."
+        )
+        self.assertFalse(Showcase.objects.exists())
+
+
+class ScreenshotDeduplicationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_user("dev").profile
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create(self, title, image):
+        return Showcase.objects.create(
+            owner=self.profile, title=title, body_md="Same screenshot", screenshot=image
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.create("First", make_image(size=(64, 64), name="a.png"))
+        second = self.create("Second", make_image(size=(64, 64), name="b.png"))
+
+        self.assertEqual(first.screenshot.name, second.screenshot.name)
+        self.assertEqual(ScreenshotBlob.objects.get(name=first.screenshot.name).refs, 2)
+        stored = os.listdir(os.path.dirname(first.screenshot.path))
+        self.assertEqual(
+            [f for f in stored if f.endswith(".png")],
+            [os.path.basename(first.screenshot.name)],
+        )
+
+    def test_unreferenced_blobs_are_collected(self):
+        first = self.create("First", make_image(size=(64, 64)))
+        second = self.create("Second", make_image(size=(64, 64)))
+        path = first.screenshot.path
+        thumb = images.derivative_name(
+            first.screenshot.name, first.screenshot_digest, "thumb"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(first.screenshot.storage.exists(thumb))
+        self.assertFalse(ScreenshotBlob.objects.exists())
+
+    def test_replacing_a_screenshot_moves_the_reference(self):
+        showcase = self.create("Replace", make_image(size=(64, 64)))
+        old_name = showcase.screenshot.name
+        showcase = Showcase.objects.get(pk=showcase.pk)
+        showcase.screenshot = make_image(size=(32, 32))
+        with self.captureOnCommitCallbacks(execute=True):
+            showcase.save()
+        self.assertFalse(ScreenshotBlob.objects.filter(name=old_name).exists())
+        self.assertEqual(
+            ScreenshotBlob.objects.get(name=showcase.screenshot.name).refs, 1
+        )
+
+
+@requires_file_db
+@skipUnless(settings.DB_PROFILE == "tuned", "runs against the tuned DB profile")
+class SQLiteTuningTest(TestCase):
+    def test_connection_hook_applies_profile_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 20_000)
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    query_budgets = {
+        "leaderboard": 2,
+        "ranking": 6,
+        "dashboard": 4,
+        "review_queue": 3,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin", "adminpass", is_staff=True)
+        for user in make_users(5, prefix="dev"):
+            make_showcases(user.profile, 1, title="S", body_md="Budget")
+
+    def setUp(self):
+        caches[settings.FRAGMENT_CACHE].clear()  # count the uncached render
+
+    def test_public_pages(self):
+        self.assertWithinBudget(self.client.get(reverse("leaderboard")))
+        self.assertWithinBudget(self.client.get(reverse("ranking")))
+
+    def test_logged_in_pages(self):
+        self.client.login(username="admin", password="adminpass")
+        self.assertWithinBudget(self.client.get(reverse("dashboard")))
+        self.assertWithinBudget(self.client.get(reverse("review_queue")))
+        self.assertWithinBudget(self.client.get(reverse("ranking")))
+
+    def test_budget_overrun_fails(self):
+        response = self.client.get(reverse("leaderboard"))
+        with mock.patch.dict(self.query_budgets, {"leaderboard": 0}):
+            with self.assertRaises(AssertionError):
+                self.assertWithinBudget(response)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("leaderboard"))
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="2 queries", tpl;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        self.assertGreater(response.wsgi_request.perf.template_time, 0)
+
+
+class FragmentCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin", "adminpass", is_staff=True)
+        cls.user = make_user("dev", "devpass")
+        cls.showcase = Showcase.objects.create(
+            owner=cls.user.profile, title="Cached", body_md="Fragment"
+        )
+
+    def setUp(self):
+        caches[settings.FRAGMENT_CACHE].clear()
+
+    def test_repeat_dashboard_is_served_from_cache(self):
+        self.client.login(username="dev", password="devpass")
+        self.client.get(reverse("dashboard"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "Cached")
+        self.assertFalse(any("clac_showcase" in q["sql"] for q in queries))
+        self.assertEqual(fragments.stats()["showcases"], {"hits": 1, "misses": 1})
+
+    def test_approval_invalidates_owner_fragments(self):
+        self.client.login(username="dev", password="devpass")
+        self.assertContains(self.client.get(reverse("dashboard")), "Pending")
+        self.assertContains(self.client.get(reverse("leaderboard")), "<td>0</td>")
+
+        award_showcase(self.showcase.pk, 150)
+
+        self.assertContains(self.client.get(reverse("dashboard")), "Approved (150")
+        self.assertContains(self.client.get(reverse("leaderboard")), "<td>150</td>")
+
+    def test_other_owners_stay_cached(self):
+        other = User.objects.create_user(username="other").profile
+        key = fragments.fragment_key("showcases", [other.pk])
+        reject_many([(self.showcase.pk, "Off topic")])
+        self.assertEqual(fragments.fragment_key("showcases", [other.pk]), key)
+
+    def test_unknown_fragment_name_is_rejected(self):
+        with self.assertRaises(TemplateSyntaxError):
+            Template(
+                "{% load fragment_cache %}"
+                "{% cachefragment nope %}{% endcachefragment %}"
+            )
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.get(reverse("leaderboard"))
+        self.client.get(reverse("leaderboard"))
+        self.assertEqual(self.client.get(reverse("fragment_stats")).status_code, 302)
+
+        self.client.login(username="admin", password="adminpass")
+        stats = self.client.get(reverse("fragment_stats")).json()
+        self.assertEqual(stats["leaderboard"], {"hits": 1, "misses": 1})
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("dev", "devpass")
+        cls.showcase = Showcase.objects.create(
+            owner=cls.user.profile, title="Validators", body_md="# Cached"
+        )
+        cls.url = reverse("showcase_detail", args=[cls.showcase.pk])
+
+    def setUp(self):
+        self.client.login(username="dev", password="devpass")
+
+    def test_matching_etag_skips_rendering(self):
+        etag = self.client.get(self.url)["ETag"]
+        with mock.patch("clac.views.get_body_html") as body_html:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+        body_html.assert_not_called()
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_and_approval_change_the_etag(self):
+        first = self.client.get(self.url)["ETag"]
+        self.showcase.title = "Edited"
+        self.showcase.save(update_fields=["title"])
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first)
+        self.assertEqual(second.status_code, 200)
+
+        award_showcase(self.showcase.pk, 10)
+        third = self.client.get(self.url, HTTP_IF_NONE_MATCH=second["ETag"])
+        self.assertContains(third, "Approved for 10 coins")
+
+    def test_rerender_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        call_command("rerender_markdown", stdout=StringIO())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_html_refresh_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        Showcase.objects.filter(pk=self.showcase.pk).update(body_html_hash="")
+        self.client.get(self.url)  # renders and stores the HTML again
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get(self.url)["ETag"]
+        User.objects.create_user(username="other", password="otherpass")
+        self.client.login(username="other", password="otherpass")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_rotated_csrf_secret_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        # What logging in again does: the page's logout token is now stale.
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "x" * 32
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_pending_messages_are_rendered_not_revalidated(self):
+        url = reverse("leaderboard")
+        etag = self.client.get(url)["ETag"]
+        self.client.post(
+            reverse("add_showcase"),
+            {"title": "New", "body_md": "A new showcase", "email": "dev@paycorp.local"},
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Showcase submitted successfully!")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_leaderboard_revalidates_until_top_ten_moves(self):
+        url = reverse("leaderboard")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        award_showcase(self.showcase.pk, 500)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "<td>500</td>")
+
+
+class CachedAuthTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("dev", "devpass")
+        (cls.showcase,) = make_showcases(cls.user.profile, 1, title="Cached")
+
+    def setUp(self):
+        caches[settings.AUTH_USER_CACHE].clear()  # entries outlive rollbacks
+        self.client.force_login(self.user)
+        self.client.get(reverse("dashboard"))  # warm the user cache
+
+    def test_warm_request_reads_no_session_user_or_profile(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "Hello, dev!")
+
+    def test_award_refreshes_cached_profile(self):
+        award_showcase(self.showcase.pk, 1500)
+        response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "<strong>Coins:</strong> 1500")
+        self.assertContains(response, "<strong>Tier:</strong> Visionary")
+
+    def test_profile_save_refreshes_cached_profile(self):
+        profile = Profile.objects.get(user=self.user)
+        profile.tier = "Innovator"
+        profile.save(update_fields=["tier"])
+        response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "<strong>Tier:</strong> Innovator")
+
+    def test_deactivated_user_is_logged_out(self):
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_locmem_is_refused_with_several_workers(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        shared = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": directory,
+        }
+        locmem = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        for alias, other in (("sessions", "fragments"), ("fragments", "sessions")):
+            caches_setting = {**settings.CACHES, alias: locmem, other: shared}
+            with override_settings(CACHES=caches_setting):
+                clac_auth.ensure_shared_cache()
+                with override_settings(WORKER_PROCESSES=4):
+                    with self.assertRaisesMessage(ImproperlyConfigured, alias):
+                        clac_auth.ensure_shared_cache()
+
+    async def test_async_lookup_uses_the_cache(self):
+        backend = clac_auth.CachedModelBackend()
+        with mock.patch.object(clac_auth, "_users") as users:
+            user = await backend.aget_user(self.user.pk)
+        users.assert_not_called()
+        self.assertEqual(user.profile.pk, self.showcase.owner_id)
+
+
+class SharedSessionCacheTest(TestCase):
+    """The default file caches, opened a second time as another worker would."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("dev", "devpass")
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        shared = {
+            alias: {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": os.path.join(directory, alias),
+            }
+            for alias in ("sessions", "fragments")
+        }
+        overrides = override_settings(
+            CACHES={**settings.CACHES, **shared}, WORKER_PROCESSES=2
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        clac_auth.ensure_shared_cache()
+        self.other_worker = caches.create_connection("sessions")
+
+        self.client.login(username="dev", password="devpass")
+        self.client.get(reverse("dashboard"))  # warm the user cache
+        self.session_key = SessionStore(self.client.session.session_key).cache_key
+        self.user_key = clac_auth._key(self.user.pk)
+
+    def test_fragment_invalidation_reaches_other_workers(self):
+        other_worker = caches.create_connection("fragments")
+        key = fragments._version_key("leaderboard", ())
+        before = fragments.version("leaderboard")
+        self.assertEqual(other_worker.get(key), before)
+        fragments.bump("leaderboard")
+        self.assertNotEqual(other_worker.get(key), before)
+
+    def test_logout_reaches_other_workers(self):
+        self.assertIsNotNone(self.other_worker.get(self.session_key))
+        self.client.post(reverse("logout"))
+        self.assertIsNone(self.other_worker.get(self.session_key))
+
+    def test_password_change_reaches_other_workers(self):
+        self.assertIsNotNone(self.other_worker.get(self.user_key))
+        self.user.set_password("newpass")
+        self.user.save()
+        self.assertIsNone(self.other_worker.get(self.user_key))
+        self.assertEqual(self.client.get(reverse("dashboard")).status_code, 302)
+
+
+@override_settings(ROOT_URLCONF="lumin.asgi_urls")
+class AsyncViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("dev", "devpass")
+        cls.showcase = Showcase.objects.create(
+            owner=cls.user.profile, title="Async notes", body_md="# Heading"
+        )
+        cls.url = reverse("showcase_detail", args=[cls.showcase.pk])
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+
+    async def test_read_pages_use_async_views(self):
+        for name, args in [
+            ("dashboard", []),
+            ("profile", []),
+            ("leaderboard", []),
+            ("showcase_detail", [self.showcase.pk]),
+        ]:
+            response = await self.async_client.get(reverse(name, args=args))
+            self.assertEqual(response.status_code, 200, name)
+            self.assertTrue(
+                asyncio.iscoroutinefunction(response.resolver_match.func), name
+            )
+            self.assertContains(response, "dev")
+
+    async def test_login_required(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 302)
+
+    async def test_stale_markdown_is_rendered_and_stored(self):
+        await Showcase.objects.filter(pk=self.showcase.pk).aupdate(body_html_hash="")
+        response = await self.async_client.get(self.url)
+        self.assertContains(response, "<h1>Heading</h1>")
+        showcase = await Showcase.objects.aget(pk=self.showcase.pk)
+        self.assertEqual(showcase.body_html_hash, body_hash("# Heading"))
+
+    async def test_conditional_get(self):
+        etag = (await self.async_client.get(self.url))["ETag"]
+        response = await self.async_client.get(
+            self.url, headers={"if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        missing = await self.async_client.get(
+            reverse("showcase_detail", args=[self.showcase.pk + 1])
+        )
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_queries_are_counted(self):
+        response = await self.async_client.get(reverse("dashboard"))
+        queries = re.search(r'desc="(\d+) queries"', response["Server-Timing"])
+        self.assertGreater(int(queries.group(1)), 0)
+
+
+class JsonApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("dev", "devpass")
+        cls.profile = cls.user.profile
+        for peer in make_users(7, prefix="peer"):
+            make_showcases(peer.profile, 1, body_md="x")
+        cls.pending = Showcase.objects.create(
+            owner=cls.profile, title="Mine", body_md="x"
+        )
+        approve_many(
+            (pk, 10 * n)
+            for n, pk in enumerate(
+                Showcase.objects.exclude(pk=cls.pending.pk).values_list(
+                    "pk", flat=True
+                ),
+                1,
+            )
+        )
+
+    def collect(self, url, **params):
+        rows, cursor = [], None
+        while True:
+            query = {**params, **({"cursor": cursor} if cursor else {})}
+            data = self.client.get(url, query).json()
+            rows += data["results"]
+            cursor = data["next"]
+            if cursor is None:
+                return rows
+
+    def test_leaderboard_pages_cover_every_rank_once(self):
+        rows = self.collect(reverse("api_leaderboard"), size=3)
+        self.assertEqual([row["rank"] for row in rows], list(range(1, 9)))
+        self.assertEqual(set(rows[0]), {"rank", "username", "coins", "tier"})
+
+    def test_field_selection(self):
+        url = reverse("api_leaderboard")
+        data = self.client.get(url, {"fields": "username,coins", "size": 1}).json()
+        self.assertEqual(data["results"], [{"username": "peer6", "coins": 70}])
+
+        response = self.client.get(url, {"fields": "password"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown field", response.json()["error"])
+
+    def test_crafted_cursor_is_a_bad_request(self):
+        self.client.login(username="dev", password="devpass")
+        for url in (reverse("api_leaderboard"), reverse("api_showcases")):
+            for values in (["x", "y"], [{"a": 1}, 2]):
+                response = self.client.get(url, {"cursor": encode_cursor(values)})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "invalid cursor"})
+
+    def test_rows_are_not_instantiated_as_models(self):
+        self.client.login(username="dev", password="devpass")
+        with mock.patch.object(Showcase, "from_db") as from_db:
+            response = self.client.get(reverse("api_showcases"))
+        self.assertEqual(len(response.json()["results"]), 7)
+        from_db.assert_not_called()
+
+    def test_showcases_require_login_and_hide_pending(self):
+        url = reverse("api_profile_showcases", args=[self.profile.pk])
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        User.objects.create_user(username="other", password="otherpass")
+        self.client.login(username="other", password="otherpass")
+        self.assertEqual(self.client.get(url).json()["results"], [])
+
+        self.client.login(username="dev", password="devpass")
+        titles = [row["title"] for row in self.client.get(url).json()["results"]]
+        self.assertEqual(titles, ["Mine"])
+
+    def test_large_pages_stream_the_same_document(self):
+        self.client.login(username="dev", password="devpass")
+        url = reverse("api_showcases")
+        expected = self.client.get(url, {"size": 5}).json()
+        with mock.patch.object(api, "STREAM_THRESHOLD", 2):
+            response = self.client.get(url, {"size": 5})
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content)
+        self.assertEqual(json.loads(body), expected)
+
+    def test_gzip(self):
+        response = self.client.get(
+            reverse("api_leaderboard"), HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            len(json.loads(gzip.decompress(response.content))["results"]), 8
+        )
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin", "adminpass", is_staff=True)
+        owner = make_user("dev").profile
+        cls.showcases = make_showcases(owner, 5, title="S", body_md="x")
+        approve_many((showcase.pk, 10) for showcase in cls.showcases[:4])
+        Showcase.objects.filter(pk=cls.showcases[0].pk).update(
+            approved_at=timezone.now() - timedelta(days=30)
+        )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_staff_csv_export_with_date_range(self):
+        url = reverse("export_data", args=["showcases"])
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.login(username="admin", password="adminpass")
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        response = self.client.get(url, {"since": since})
+        self.assertTrue(response.streaming)
+        table = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(table[0][:4], ["id", "owner_id", "username", "title"])
+        self.assertEqual([row[3] for row in table[1:]], ["S 1", "S 2", "S 3"])
+
+    def test_ndjson_export_resumes_after_id(self):
+        self.client.login(username="admin", password="adminpass")
+        response = self.client.get(
+            reverse("export_data", args=["profiles"]),
+            {"format": "ndjson", "after": self.admin.profile.pk},
+        )
+        records = [json.loads(line) for line in response.streaming_content]
+        self.assertEqual([record["username"] for record in records], ["dev"])
+
+    def test_csv_cells_cannot_start_a_formula(self):
+        Showcase.objects.filter(pk=self.showcases[1].pk).update(
+            title='=HYPERLINK("http://evil.example","x")'
+        )
+        self.client.login(username="admin", password="adminpass")
+        url = reverse("export_data", args=["showcases"])
+        response = self.client.get(url)
+        table = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(table[2][3], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(table[3][3], "S 2")
+
+        response = self.client.get(url, {"format": "ndjson"})
+        records = [json.loads(line) for line in response.streaming_content]
+        self.assertEqual(records[1]["title"], '=HYPERLINK("http://evil.example","x")')
+
+    def test_bad_parameters(self):
+        self.client.login(username="admin", password="adminpass")
+        url = reverse("export_data", args=["showcases"])
+        self.assertEqual(self.client.get(url, {"since": "soon"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"format": "xml"}).status_code, 400)
+
+    def test_command_resumes_interrupted_file(self):
+        path = os.path.join(self.directory, "showcases.csv")
+        call_command("export_data", "showcases", output=path, stderr=StringIO())
+        with open(path) as handle:
+            complete = handle.read()
+
+        # Simulate a dump cut off halfway through its third row.
+        lines = complete.splitlines(keepends=True)
+        with open(path, "w", newline="") as handle:
+            handle.write("".join(lines[:3]) + lines[3][:4])
+
+        call_command(
+            "export_data", "showcases", output=path, resume=True, stderr=StringIO()
+        )
+        with open(path) as handle:
+            self.assertEqual(handle.read(), complete)
+
+
+class CoinLedgerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_user("dev").profile
+        cls.showcases = make_showcases(cls.profile, 4, title="S", body_md="x")
+
+    def test_awards_are_recorded_per_showcase(self):
+        award_showcase(self.showcases[0].pk, 30)
+        approve_many([(self.showcases[1].pk, 20), (self.showcases[2].pk, 5)])
+
+        entries = CoinTransaction.objects.filter(profile=self.profile).order_by("id")
+        self.assertEqual(
+            list(entries.values_list("showcase_id", "amount", "kind")),
+            [
+                (self.showcases[0].pk, 30, "award"),
+                (self.showcases[1].pk, 20, "award"),
+                (self.showcases[2].pk, 5, "award"),
+            ],
+        )
+        self.assertEqual(ledger.balance(self.profile.pk), 55)
+
+    def test_balance_is_snapshot_plus_tail(self):
+        award_showcase(self.showcases[0].pk, 30)
+        award_showcase(self.showcases[1].pk, 20)
+        self.assertEqual(ledger.take_snapshots(), 1)
+        snapshot = BalanceSnapshot.objects.get(profile=self.profile)
+        self.assertEqual(snapshot.balance, 50)
+
+        award_showcase(self.showcases[2].pk, 7)
+        self.assertEqual(ledger.balance(self.profile.pk), 57)
+        # One new transaction is below the threshold, so nothing is written.
+        self.assertEqual(ledger.take_snapshots(min_tail=2), 0)
+        self.assertEqual(ledger.take_snapshots(), 1)
+        self.assertEqual(ledger.balance(self.profile.pk), 57)
+
+    def test_reconcile_reports_drift(self):
+        other = User.objects.create_user(username="other").profile
+        award_showcase(self.showcases[0].pk, 30)
+        ledger.take_snapshots()
+        out = StringIO()
+        call_command("reconcile_coins", stdout=out)
+        self.assertIn("All balances match", out.getvalue())
+
+        Profile.objects.filter(pk=other.pk).update(coins=99)
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, "1 profiles disagree"):
+            call_command("reconcile_coins", stdout=out)
+        self.assertIn(f"Profile {other.pk}: coins=99 ledger=0 (+99)", out.getvalue())
+
+    def test_reconcile_is_a_single_query(self):
+        award_showcase(self.showcases[0].pk, 30)
+        with CaptureQueriesContext(connection) as queries:
+            list(ledger.mismatches())
+        self.assertEqual(len(queries), 1)
+
+
+class RankingWindowTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recent = make_user("recent").profile
+        cls.veteran = make_user("veteran").profile
+        today = timezone.localdate()
+        CoinBucket.objects.create(
+            profile=cls.veteran, day=today - timedelta(days=20), coins=300
+        )
+        CoinBucket.objects.create(
+            profile=cls.veteran, day=today - timedelta(days=90), coins=900
+        )
+        Profile.objects.filter(pk=cls.veteran.pk).update(coins=1200)
+        ranking.rebuild()
+        (showcase,) = make_showcases(cls.recent, 1, title="New", body_md="x")
+        award_showcase(showcase.pk, 50)
+
+    def setUp(self):
+        caches[settings.FRAGMENT_CACHE].clear()
+
+    def scores(self, window):
+        return [
+            (profile.user.username, profile.score)
+            for profile in ranking.top_for_window(window)
+        ]
+
+    def test_windows_only_count_their_days(self):
+        self.assertEqual(self.scores("week"), [("recent", 50)])
+        self.assertEqual(self.scores("month"), [("veteran", 300), ("recent", 50)])
+        self.assertEqual(self.scores("all"), [("veteran", 1200), ("recent", 50)])
+
+    def test_awards_accumulate_in_todays_bucket(self):
+        showcase = Showcase.objects.create(owner=self.recent, title="B", body_md="x")
+        approve_many([(showcase.pk, 25)])
+        bucket = CoinBucket.objects.get(profile=self.recent)
+        self.assertEqual((bucket.day, bucket.coins), (timezone.localdate(), 75))
+
+    def test_window_query_reads_buckets_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.scores("month")
+        self.assertFalse(any("clac_showcase" in q["sql"] for q in queries))
+
+    def test_ranking_page_window_selector(self):
+        response = self.client.get(reverse("ranking"), {"window": "week"})
+        self.assertContains(response, "Last 7 days")
+        self.assertContains(response, "<td>recent</td>")
+        self.assertNotContains(response, "<td>veteran</td>")
+
+        showcase = Showcase.objects.create(owner=self.veteran, title="V", body_md="x")
+        award_showcase(showcase.pk, 5)
+        response = self.client.get(reverse("ranking"), {"window": "week"})
+        self.assertContains(response, "<td>veteran</td>")
+
+        response = self.client.get(reverse("ranking"), {"window": "decade"})
+        self.assertEqual(response.context["window"], "all")
+
+
+class ProvisioningTest(TestCase):
+    def ranked_user_ids(self):
+        return list(
+            LeaderboardEntry.objects.order_by("rank").values_list(
+                "profile__user_id", flat=True
+            )
+        )
+
+    def test_signup_creates_exactly_one_profile(self):
+        user = User.objects.create_user(username="dev")
+        self.assertEqual(Profile.objects.filter(user=user).count(), 1)
+        fresh = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(1):
+            profile = provisioning.ensure_profile(fresh)
+        self.assertEqual(profile, user.profile)
+        self.assertEqual(Profile.objects.filter(user=user).count(), 1)
+
+    def test_bulk_created_users_are_provisioned_in_batches(self):
+        existing = User.objects.create_user(username="existing")
+        users = User.objects.bulk_create(User(username=f"bulk{i}") for i in range(25))
+        self.assertFalse(Profile.objects.filter(user__in=users).exists())
+
+        created = provisioning.provision_profiles([existing, *users], batch_size=10)
+
+        self.assertEqual(created, 25)
+        self.assertEqual(Profile.objects.count(), 26)
+        self.assertEqual(ranking.total(), 26)
+        self.assertEqual(self.ranked_user_ids()[0], existing.pk)
+        self.assertEqual(
+            list(LeaderboardEntry.objects.values_list("rank", flat=True)),
+            list(range(1, 27)),
+        )
+        self.assertEqual(provisioning.provision_profiles(users), 0)
+
+    def test_out_of_order_batch_rebuilds_the_board(self):
+        later = User.objects.create_user(username="later").profile
+        Profile.objects.filter(pk=later.pk).update(
+            joined=timezone.now() + timedelta(days=1)
+        )
+        ranking.rebuild()
+        users = User.objects.bulk_create(User(username=f"bulk{i}") for i in range(3))
+        provisioning.provision_profiles(users)
+        self.assertEqual(self.ranked_user_ids()[-1], later.user_id)
+        self.assertEqual(ranking.total(), 4)
+
+
+class ShowcaseCounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dev = make_user("dev", "devpass", email="dev@paycorp.local")
+
+    def setUp(self):
+        caches[settings.FRAGMENT_CACHE].clear()
+
+    def counts(self):
+        profile = Profile.objects.get(user=self.dev)
+        return (
+            profile.showcases_pending,
+            profile.showcases_approved,
+            profile.showcases_rejected,
+            profile.coins_awarded,
+        )
+
+    def submit(self, title):
+        return self.client.post(
+            reverse("add_showcase"),
+            {
+                "title": title,
+                "body_md": "Long enough body",
+                "email": "dev@paycorp.local",
+            },
+        )
+
+    def test_submit_approve_reject_and_delete_move_the_counters(self):
+        self.client.force_login(self.dev)
+        for title in ["One", "Two", "Three", "Four"]:
+            self.assertEqual(self.submit(title).status_code, 302)
+        self.assertEqual(self.counts(), (4, 0, 0, 0))
+        one, two, three, four = Showcase.objects.order_by("pk")
+
+        award_showcase(one.pk, 100)
+        approve_many([(two.pk, 40), (one.pk, 999)])
+        reject_many([(three.pk, "Off topic"), (two.pk, "Too late")])
+        self.assertEqual(self.counts(), (1, 2, 1, 140))
+
+        Showcase.objects.get(pk=two.pk).delete()
+        four.delete()
+        self.assertEqual(self.counts(), (0, 1, 1, 100))
+        self.assertEqual(counters.recount(), [])
+
+    def test_dashboard_shows_counters_from_the_cached_profile(self):
+        make_showcases(self.dev.profile, 3)
+        make_showcases(self.dev.profile, 2, approved=True, coins_award=700)
+        self.client.force_login(self.dev)
+        self.client.get(reverse("dashboard"))  # warm the user cache
+        reject_many([(Showcase.objects.pending().first().pk, "No")])
+
+        response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "2 pending,\n    2 approved, 1 rejected")
+        self.assertContains(response, "(1400 coins awarded)")
+
+    def test_showcase_lists_are_paginated_and_projected(self):
+        make_showcases(self.dev.profile, 25)
+        self.client.force_login(self.dev)
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(reverse("dashboard"))
+        listed = [q["sql"] for q in queries if 'FROM "clac_showcase"' in q["sql"]]
+        self.assertEqual(len(listed), 1)
+        self.assertNotIn("body_md", listed[0])
+        self.assertEqual(len(first.context["page"].items), 20)
+        self.assertEqual(first.context["page"].items[0].title, "Showcase 24")
+
+        cursor = first.context["page"].next_cursor
+        second = self.client.get(reverse("profile"), {"cursor": cursor})
+        self.assertEqual(
+            [s.title for s in second.context["page"].items],
+            [f"Showcase {i}" for i in range(4, -1, -1)],
+        )
+        self.assertIsNone(second.context["page"].next_cursor)
+        for token in ("not a cursor", encode_cursor(["x", "y"]), encode_cursor([1])):
+            junk = self.client.get(reverse("dashboard"), {"cursor": token})
+            self.assertEqual(junk.status_code, 200)
+            self.assertEqual(junk.context["cursor"], "")
+            self.assertEqual(len(junk.context["page"].items), 20)
+
+    def test_recount_command_repairs_drift(self):
+        make_showcases(self.dev.profile, 2, approved=True, coins_award=50)
+        Profile.objects.filter(user=self.dev).update(
+            showcases_pending=7, coins_awarded=0
+        )
+        with self.assertRaises(CommandError):
+            call_command("recount_showcases", "--check", stdout=StringIO())
+        self.assertEqual(self.counts(), (7, 2, 0, 0))
+
+        out = StringIO()
+        call_command("recount_showcases", stdout=out)
+        self.assertIn("pending 7->0, awarded 0->100", out.getvalue())
+        self.assertEqual(self.counts(), (0, 2, 0, 100))
+        self.assertEqual(counters.recount(), [])
+
+
+class UserImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_user("taken", email="taken@paycorp.local")
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_csv(self, rows):
+        path = os.path.join(self.directory, "team.csv")
+        with open(path, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["username", "email", "password"])
+            writer.writerows(rows)
+        return path
+
+    def test_import_validates_and_creates_users_with_profiles(self):
+        path = self.write_csv(
+            [
+                ["ana", "ana@paycorp.local", "s3cret"],
+                ["bo", "bo@paycorp.local", ""],
+                ["eve", "eve@example.com", "x"],
+                ["ana", "ana2@paycorp.local", "x"],
+                ["taken", "taken@paycorp.local", "x"],
+                ["bad name!", "bad@paycorp.local", "x"],
+            ]
+        )
+        err = StringIO()
+        call_command(
+            "import_users", path, "--workers", "0", "--batch-size", "4", stderr=err
+        )
+
+        ana = User.objects.get(username="ana")
+        self.assertTrue(ana.check_password("s3cret"))
+        self.assertFalse(User.objects.get(username="bo").has_usable_password())
+        self.assertFalse(User.objects.filter(username="eve").exists())
+        self.assertEqual(User.objects.filter(email="ana2@paycorp.local").count(), 0)
+        self.assertEqual(Profile.objects.count(), 3)
+        self.assertEqual(ranking.total(), 3)
+        self.assertIn("Record 3 (eve): email must be @paycorp.local", err.getvalue())
+        self.assertIn("Record 4 (ana): duplicate username in file", err.getvalue())
+        self.assertIn(
+            "6 records: 2 created, 1 already present, 3 rejected", err.getvalue()
+        )
+
+    def test_malformed_ndjson_records_are_rejected(self):
+        path = os.path.join(self.directory, "team.ndjson")
+        with open(path, "w") as fh:
+            for line in (
+                "[1, 2]",
+                '"x"',
+                "{not json",
+                '{"username": 5, "email": "five@paycorp.local"}',
+                '{"username": "cy", "email": "cy@paycorp.local", "last_name": []}',
+                '{"username": "di", "email": "di@paycorp.local"}',
+            ):
+                fh.write(line + "\n")
+        err = StringIO()
+        call_command("import_users", path, "--workers", "0", stderr=err)
+
+        self.assertEqual(
+            list(User.objects.exclude(username="taken").values_list("username")),
+            [("di",)],
+        )
+        self.assertIn("Record 1 (?): record is not an object", err.getvalue())
+        self.assertIn("Record 2 (?): record is not an object", err.getvalue())
+        self.assertIn("Record 4 (?): username must be text", err.getvalue())
+        self.assertIn("Record 5 (cy): last_name must be text", err.getvalue())
+        self.assertIn(
+            "6 records: 1 created, 0 already present, 5 rejected", err.getvalue()
+        )
+
+    def test_resume_skips_committed_records(self):
+        path = self.write_csv(
+            [
+                ["skipped", "skipped@paycorp.local", "x"],
+                ["kept", "kept@paycorp.local", "x"],
+            ]
+        )
+        checkpoint = os.path.join(self.directory, "team.checkpoint")
+        with open(checkpoint, "w") as fh:
+            fh.write("1")
+        call_command(
+            "import_users",
+            path,
+            "--workers=0",
+            f"--checkpoint={checkpoint}",
+            "--resume",
+            stderr=StringIO(),
+            stdout=StringIO(),
+        )
+        self.assertFalse(User.objects.filter(username="skipped").exists())
+        self.assertTrue(User.objects.filter(username="kept").exists())
+        with open(checkpoint) as fh:
+            self.assertEqual(fh.read(), "2")
+
+    def test_passwords_are_hashed_in_worker_processes(self):
+        records = [
+            {"username": f"dev{i}", "email": f"dev{i}@paycorp.local", "password": "pw"}
+            for i in range(6)
+        ]
+        result = onboarding.import_users(records, batch_size=4, workers=2)
+        self.assertEqual((result.created, result.processed), (6, 6))
+        self.assertTrue(User.objects.get(username="dev5").check_password("pw"))
+        self.assertTrue(Profile.objects.filter(user__username="dev5").exists())
+
+
+class ShowcaseSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Created one by one: the search index is filled by post_save.
+        cls.user = make_user("dev", "devpass")
+        cls.other = make_user("other").profile
+        cls.match = Showcase.objects.create(
+            owner=cls.other,
+            title="Realtime dashboards",
+            body_md="Streaming <b>charts</b> for the ops team using websockets.",
+        )
+        cls.body_only = Showcase.objects.create(
+            owner=cls.other,
+            title="Ops tooling",
+            body_md="A dashboard for deploys.",
+        )
+        cls.draft = Showcase.objects.create(
+            owner=cls.user.profile, title="Dashboard draft", body_md="WIP"
+        )
+        approve_many([(cls.match.pk, 10), (cls.body_only.pk, 10)])
+
+    def setUp(self):
+        self.backend = search.get_backend()
+
+    def test_ranking_and_highlighting(self):
+        hits = self.backend.search("dashboard")
+        self.assertEqual(
+            [hit.showcase_id for hit in hits], [self.match.pk, self.body_only.pk]
+        )
+        self.assertEqual(hits[0].title, "Realtime <mark>dashboards</mark>")
+        self.assertIn(
+            "&lt;b&gt;<mark>charts</mark>&lt;/b&gt;",
+            self.backend.search("charts")[0].snippet,
+        )
+
+    def test_filters(self):
+        self.assertNotIn(
+            self.draft.pk, [hit.showcase_id for hit in self.backend.search("draft")]
+        )
+        mine = self.backend.search(
+            "dashboard", approved_only=False, owner_id=self.user.profile.pk
+        )
+        self.assertEqual([hit.showcase_id for hit in mine], [self.draft.pk])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.match.title = "Realtime graphs"
+        self.match.body_md = "Nothing to see"
+        self.match.save(update_fields=["title", "body_md"])
+        self.assertEqual(
+            [hit.showcase_id for hit in self.backend.search("dashboard")],
+            [self.body_only.pk],
+        )
+        self.body_only.delete()
+        self.assertEqual(self.backend.search("dashboard"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.backend.search('"unterminated OR NEAR('), [])
+        self.assertEqual(self.backend.search("!!!"), [])
+
+    def test_reindex_command(self):
+        self.backend.clear()
+        self.assertEqual(self.backend.search("dashboard"), [])
+        call_command("search_reindex", chunk_size=1, stdout=StringIO())
+        self.assertEqual(len(self.backend.search("dashboard")), 2)
+
+    def test_incomplete_backend_fails_on_instantiation(self):
+        class NoSearch(search.SearchBackend):
+            def index(self, showcases):
+                pass
+
+        with self.assertRaises(TypeError):
+            NoSearch()
+
+    def test_search_page(self):
+        self.client.login(username="dev", password="devpass")
+        response = self.client.get(reverse("search"), {"q": "dash"})
+        self.assertContains(response, "Realtime <mark>dashboards</mark>", html=True)
+        self.assertNotContains(response, "Dashboard draft")
+
+        response = self.client.get(reverse("search"), {"q": "dash", "mine": "1"})
+        self.assertEqual(
+            [hit.showcase_id for hit in response.context["hits"]], [self.draft.pk]
+        )
+
+
+task_calls = []
+
+
+@tasks.task
+def record_call(value):
+    task_calls.append(value)
+
+
+@tasks.task(max_attempts=2)
+def always_fails():
+    raise RuntimeError("boom")
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        task_calls.clear()
+
+    def test_enqueued_tasks_run_by_priority(self):
+        record_call.enqueue("low")
+        record_call.enqueue("high", priority=9)
+        record_call.enqueue("later", delay=timedelta(hours=1))
+        self.assertEqual(task_calls, [])
+
+        self.assertEqual(tasks.drain(), 2)
+        self.assertEqual(task_calls, ["high", "low"])
+        self.assertEqual(
+            sorted(Task.objects.values_list("status", flat=True)),
+            ["done", "done", "queued"],
+        )
+
+    def test_failures_back_off_then_fail(self):
+        queued = always_fails.enqueue()
+        tasks.drain()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ("queued", 1))
+        self.assertGreater(queued.run_after, timezone.now())
+        self.assertIn("RuntimeError: boom", queued.last_error)
+
+        Task.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        tasks.drain()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ("failed", 2))
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        with override_settings(CLAC_TASKS_BACKOFF=5, CLAC_TASKS_BACKOFF_MAX=30):
+            delays = [tasks.backoff(n).total_seconds() for n in (1, 2, 3, 4)]
+        for delay, base in zip(delays, [5, 10, 20, 30]):
+            self.assertTrue(base <= delay <= base * 1.1)
+
+    @override_settings(CLAC_TASKS_EAGER=True)
+    def test_eager_mode_runs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(record_call.enqueue("now"))
+            self.assertEqual(task_calls, [])
+        self.assertEqual(task_calls, ["now"])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(CLAC_TASKS_EAGER=True)
+    def test_eager_mode_skips_rolled_back_work(self):
+        user = User.objects.create_user(username="dev", email="dev@paycorp.local")
+        showcase = Showcase.objects.create(
+            owner=user.profile, title="Good", body_md="x"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    approve_many([(showcase.pk, 40)])
+                    raise RuntimeError("rolled back")
+        self.assertEqual(mail.outbox, [])
+
+    def test_moderation_queues_owner_notifications(self):
+        user = User.objects.create_user(username="dev", email="dev@paycorp.local")
+        approved, rejected = (
+            Showcase.objects.create(owner=user.profile, title=title, body_md="x")
+            for title in ("Good", "Bad")
+        )
+        approve_many([(approved.pk, 40)])
+        reject_many([(rejected.pk, "Needs a demo")])
+        self.assertEqual(
+            Task.objects.filter(name=jobs.notify_moderation_decision.name).count(), 2
+        )
+        self.assertEqual(mail.outbox, [])
+
+        tasks.drain()
+        subjects = sorted(message.subject for message in mail.outbox)
+        self.assertEqual(subjects, ["“Bad” was not approved", "“Good” was approved"])
+
+    def test_screenshot_derivatives_wait_for_the_worker(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            profile = User.objects.create_user(username="dev").profile
+            showcase = Showcase.objects.create(
+                owner=profile, title="Shot", body_md="x", screenshot=make_image()
+            )
+            self.assertEqual(showcase.screenshot_digest, "")
+            tasks.drain()
+            showcase.refresh_from_db()
+            self.assertEqual(len(showcase.screenshot_digest), 64)
+
+
+@requires_file_db
+class TaskWorkerTest(TransactionTestCase):
+    def test_thread_pool_runs_each_task_once(self):
+        task_calls.clear()
+        for i in range(12):
+            record_call.enqueue(i)
+        processed = tasks.Worker(concurrency=3, poll_interval=0.05).run(burst=True)
+        self.assertEqual(processed, 12)
+        self.assertEqual(sorted(task_calls), list(range(12)))
+        self.assertFalse(Task.objects.exclude(status=Task.DONE).exists())
+
+
+@requires_file_db
+class BenchmarkSuiteTest(TransactionTestCase):
+    def test_seed_and_drive_every_scenario(self):
+        bench.seed(profiles=20, showcases=60, batch_size=25)
+        self.assertEqual(Profile.objects.count(), 21)  # plus the staff user
+        self.assertEqual(Showcase.objects.count(), 60)
+        self.assertEqual(ranking.total(), 21)
+
+        report = bench.run(requests=6, concurrency=2)
+
+        self.assertEqual(set(report["scenarios"]), set(bench.scenarios()))
+        for name, result in report["scenarios"].items():
+            self.assertEqual(result["errors"], 0, name)
+            self.assertEqual(result["requests"], 6, name)
+            self.assertIn("p99", result["latency_ms"])
+        self.assertEqual(bench.compare(report, report)["leaderboard"]["p50_ms"], 0.0)
+
+    def test_drive_through_asgi(self):
+        bench.seed(profiles=10, showcases=20, batch_size=25)
+        names = ["leaderboard", "dashboard", "showcase_detail"]
+        report = bench.run(names, requests=6, concurrency=3, server="asgi")
+        self.assertEqual(report["meta"]["server"], "asgi")
+        for name in names:
+            self.assertEqual(report["scenarios"][name]["errors"], 0, name)
+            self.assertEqual(report["scenarios"][name]["requests"], 6, name)
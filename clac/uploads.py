@@ -0,0 +1,80 @@
+import warnings
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+# How much of the upload to buffer while looking for the image header.
+HEADER_LIMIT = 256 * 2**10
+
+
+def header_size(header):
+    """Pixel size read from an image header, or None if not (yet) recognisable.
+
+    Raises ``Image.DecompressionBombError`` for sizes Pillow refuses outright.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+        try:
+            with Image.open(BytesIO(header)) as image:
+                return image.size
+        except (OSError, SyntaxError, ValueError):
+            return None
+
+
+class CappedImageUploadHandler(TemporaryFileUploadHandler):
+    """Stream every upload to a temp file and reject oversized images early.
+
+    Uploads are written to disk in ``chunk_size`` pieces, so memory stays
+    bounded whatever the client sends. A file is dropped as soon as it passes
+    ``SCREENSHOT_MAX_BYTES``, or once its header declares more than
+    ``SCREENSHOT_MAX_PIXELS`` pixels, before anything decodes it. Rejections are
+    recorded on ``request.upload_errors`` keyed by field name for the form.
+    """
+
+    chunk_size = 64 * 2**10
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_bytes = settings.SCREENSHOT_MAX_BYTES
+        self.max_pixels = settings.SCREENSHOT_MAX_PIXELS
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b""
+        self.header_checked = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.reject(f"File is larger than {filesizeformat(self.max_bytes)}.")
+        if not self.header_checked:
+            self.check_header(raw_data)
+        self.file.write(raw_data)
+
+    def check_header(self, raw_data):
+        self.header += raw_data
+        try:
+            size = header_size(self.header)
+        except Image.DecompressionBombError:
+            self.reject("Image has too many pixels.")
+        if size is None and len(self.header) < HEADER_LIMIT:
+            return
+        # Unrecognisable headers are left to the form's image validation.
+        self.header_checked = True
+        self.header = b""
+        if size is not None and size[0] * size[1] > self.max_pixels:
+            self.reject(
+                f"Image is too large ({size[0]}x{size[1]} pixels); "
+                f"the limit is {self.max_pixels:,} pixels."
+            )
+
+    def reject(self, message):
+        if self.request is not None:
+            if not hasattr(self.request, "upload_errors"):
+                self.request.upload_errors = {}
+            self.request.upload_errors[self.field_name] = message
+        raise SkipFile(message)
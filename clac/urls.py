@@ -5,7 +5,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', home, name='home'),
@@ -23,10 +23,12 @@ urlpatterns = [
     path("showcase/<int:id>/", views.showcase_detail, name="showcase_detail"),
     path("leaderboard/", views.leaderboard, name="leaderboard"),
     path("ranking/", views.ranking_view, name="ranking"),
+    path("search/", views.search_view, name="search"),
     # Moderator views
     path("moderation/", views.moderation_dashboard, name="moderation_dashboard"),
     path("moderation/review/", views.review_queue, name="review_queue"),
      path("accounts/", include("django.contrib.auth.urls")),
+    path("moderation/review/bulk/", views.bulk_moderate, name="bulk_moderate"),
     path(
         "moderation/review/<int:id>/approve/",
         views.approve_showcase,
@@ -37,6 +39,20 @@ urlpatterns = [
         views.reject_showcase,
         name="reject_showcase",
     ),
+    # JSON API
+    path("api/leaderboard/", api.leaderboard, name="api_leaderboard"),
+    path("api/showcases/", api.showcases, name="api_showcases"),
+    path(
+        "api/profiles/<int:id>/showcases/",
+        api.profile_showcases,
+        name="api_profile_showcases",
+    ),
+    path(
+        "moderation/export/<str:dataset>/", views.export_data, name="export_data"
+    ),
+    path(
+        "moderation/fragment-stats/", views.fragment_stats, name="fragment_stats"
+    ),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,14 +1,26 @@
-import markdown2
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login,logout
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
-from django.utils.timezone import now
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 
+from . import export, fragments, ranking, search
+from .conditional import leaderboard_condition, showcase_condition
 from .forms import RegisterForm, ShowcaseForm
-from .models import Profile, Showcase
+from .models import LISTING_ORDER, Showcase
+from .moderation import approve_many, award_showcase, reject_many
+from .pagination import clean_cursor, keyset_page
+from .rendering import get_body_html
 def home(request):
     return render(request, 'home.html', {'force_show_login_register': True})
 
@@ -22,9 +34,7 @@ def register(request):
         if form.is_valid():
             user = form.save(commit=False)
             user.set_password(form.cleaned_data["password"])
-            user.save()
-            if not hasattr(user, "profile"):
-                Profile.objects.create(user=user)
+            user.save()  # the post_save receiver provisions the profile
             login(request, user)
             messages.success(request, "Registration successful!")
             return redirect("dashboard")
@@ -39,43 +49,36 @@ def register(request):
 # -------------------------------
 # ✅ USER VIEWS
 # -------------------------------
-@login_required
-def dashboard(request):
+def _own_showcases(request):
     profile = request.user.profile
-    showcases = profile.showcases.all()
-    return render(
-        request, "clac/dashboard.html", {"profile": profile, "showcases": showcases}
-    )
+    cursor = clean_cursor(request.GET.get("cursor"), Showcase, LISTING_ORDER)
+    # Lazy: a cached fragment renders without running the query.
+    page = SimpleLazyObject(lambda: profile.showcases.listing_page(cursor))
+    return {"profile": profile, "page": page, "cursor": cursor}
 
 
+@login_required
+def dashboard(request):
+    return render(request, "clac/dashboard.html", _own_showcases(request))
+
 
 @login_required
 def profile_view(request):
-    profile = request.user.profile
-    showcases = profile.showcases.all()
-    return render(
-        request,
-        "clac/profile.html",
-        {
-            "profile": profile,
-            "showcases": showcases,
-        },
-    )
+    return render(request, "clac/profile.html", _own_showcases(request))
 
 
 @login_required
+@showcase_condition
 def showcase_detail(request, id):
-    showcase = get_object_or_404(Showcase, id=id)
-    body_html = markdown2.markdown(
-        showcase.body_md,
-        extras=["fenced-code-blocks", "code-friendly", "highlightjs-lang"],
-    )
+    showcase = get_object_or_404(Showcase.objects.select_related("owner__user"), id=id)
+    body_html = get_body_html(showcase)
     return render(
         request,
         "clac/showcase_detail.html",
         {
             "showcase": showcase,
             "body_html": body_html,
+            "screenshot_url": showcase.full_url,
         },
     )
 
@@ -83,7 +86,11 @@ def showcase_detail(request, id):
 @login_required
 def add_showcase(request):
     if request.method == "POST":
-        form = ShowcaseForm(request.POST, request.FILES)
+        form = ShowcaseForm(
+            request.POST,
+            request.FILES,
+            upload_errors=getattr(request, "upload_errors", None),
+        )
         if form.is_valid():
             email = form.cleaned_data["email"]
             if not email.endswith("@paycorp.local"):
@@ -92,7 +99,8 @@ def add_showcase(request):
 
             showcase = form.save(commit=False)
             showcase.owner = request.user.profile
-            showcase.save()
+            with transaction.atomic():  # the row and its owner's counters
+                showcase.save()
             messages.success(request, "Showcase submitted successfully!")
             return redirect("dashboard")
         else:
@@ -108,13 +116,64 @@ def add_showcase(request):
 # -------------------------------
 # ✅ PUBLIC VIEWS
 # -------------------------------
+@leaderboard_condition
 def leaderboard(request):
-    profiles = Profile.objects.order_by("-coins", "joined")[:10]
+    profiles = ranking.top(10)
     return render(request, "clac/leaderboard.html", {"profiles": profiles})
 
 
 def ranking_view(request):
-    return render(request, "clac/ranking.html")
+    window = request.GET.get("window", "all")
+    if window not in ranking.WINDOWS:
+        window = "all"
+    context = {
+        "top": ranking.top_for_window(window, 10),
+        "total": ranking.total(),
+        "window": window,
+        "windows": ranking.WINDOWS,
+        # Windows slide daily, so cached windowed rows are keyed by the date.
+        "today": timezone.localdate(),
+    }
+    if request.user.is_authenticated:
+        rank = ranking.rank_of_user(request.user)
+        if rank is not None:
+            context["rank"] = rank
+            context["neighbours"] = ranking.neighbours(rank)
+    return render(request, "clac/ranking.html", context)
+
+
+SEARCH_PAGE_SIZE = 20
+
+
+@login_required
+def search_view(request):
+    query = request.GET.get("q", "").strip()
+    mine = request.GET.get("mine") == "1"
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    hits = []
+    if query:
+        # Members search approved work, plus their own drafts with "mine".
+        hits = search.get_backend().search(
+            query,
+            approved_only=not (mine or request.user.is_staff),
+            owner_id=request.user.profile.pk if mine else None,
+            limit=SEARCH_PAGE_SIZE + 1,
+            offset=(page - 1) * SEARCH_PAGE_SIZE,
+        )
+    return render(
+        request,
+        "clac/search.html",
+        {
+            "query": query,
+            "mine": mine,
+            "hits": hits[:SEARCH_PAGE_SIZE],
+            "page": page,
+            "has_next": len(hits) > SEARCH_PAGE_SIZE,
+        },
+    )
 
 
 # -------------------------------
@@ -125,48 +184,149 @@ def moderation_dashboard(request):
     return render(request, "clac/moderation_dashboard.html")
 
 
+REVIEW_PAGE_SIZE = 50
+
+
 @staff_member_required
 def review_queue(request):
-    pending = Showcase.objects.filter(approved=False)
-    return render(request, "clac/admin_review.html", {"pending": pending})
+    queryset = (
+        Showcase.objects.pending()
+        .select_related("owner__user")
+        .only(
+            "id",
+            "title",
+            "created_at",
+            "screenshot",
+            "screenshot_digest",
+            "owner__id",
+            "owner__user__id",
+            "owner__user__username",
+        )
+    )
+    page = keyset_page(
+        queryset,
+        ("created_at", "id"),
+        cursor=request.GET.get("cursor"),
+        size=REVIEW_PAGE_SIZE,
+    )
+    return render(
+        request,
+        "clac/admin_review.html",
+        {"pending": page.items, "next_cursor": page.next_cursor},
+    )
 
 
 @staff_member_required
 def approve_showcase(request, id):
     if request.method == "POST":
-        print("✅ approve_showcase view hit")
-        coins = int(request.POST.get("coins", 0))
-        showcase = get_object_or_404(Showcase, id=id)
-        showcase.approved = True
-        showcase.coins_award = coins
-        showcase.approved_at = now()
-        showcase.save()
-
-        profile = showcase.owner
-        profile.coins += coins
-        profile.update_tier()
-        profile.save()
-
-        messages.success(request, f"Showcase approved and {coins} coins awarded.")
+        try:
+            coins = int(request.POST.get("coins", 0))
+            if coins < 0:
+                raise ValueError
+        except ValueError:
+            messages.error(request, "Coins must be a whole number of 0 or more.")
+            return redirect("review_queue")
+        if award_showcase(id, coins):
+            messages.success(request, f"Showcase approved and {coins} coins awarded.")
+        elif Showcase.objects.filter(id=id).exists():
+            messages.warning(request, "Showcase is no longer pending.")
+        else:
+            raise Http404("No Showcase matches the given query.")
     return redirect("review_queue")
 
 
 @staff_member_required
 def reject_showcase(request, id):
-    showcase = get_object_or_404(Showcase, id=id)
+    get_object_or_404(Showcase.objects.only("id"), id=id)
 
     if request.method == "POST":
         reason = request.POST.get("reason", "").strip()
         if not reason:
             messages.error(request, "Rejection reason is required.")
-            pending = Showcase.objects.filter(approved=False)
-            return render(request, "clac/admin_review.html", {"pending": pending})
+            return redirect("review_queue")
 
-        showcase.admin_note = reason
-        showcase.save()
-        messages.warning(request, f"Showcase rejected with reason: {reason}")
+        if reject_many([(id, reason)]).applied:
+            messages.warning(request, f"Showcase rejected with reason: {reason}")
+        else:
+            messages.warning(request, "Showcase is no longer pending.")
         return redirect("review_queue")
     def login_user(request):
         return render(request,'login.html',())
     def logout_user(request):
          return redirect('login')
+
+
+@staff_member_required
+def bulk_moderate(request):
+    if request.method != "POST":
+        return redirect("review_queue")
+
+    # Row buttons post "approve-<id>"/"reject-<id>", the batch buttons a bare
+    # action that applies to every checked row.
+    action, _, single_id = request.POST.get("action", "").partition("-")
+    ids = [single_id] if single_id else request.POST.getlist("selected")
+
+    pairs = []
+    invalid = 0
+    for raw_id in ids:
+        try:
+            showcase_id = int(raw_id)
+            if action == "approve":
+                value = int(request.POST.get(f"coins-{showcase_id}", ""))
+                if value < 0:
+                    raise ValueError
+            else:
+                value = request.POST.get(f"reason-{showcase_id}", "").strip()
+                if not value:
+                    raise ValueError
+        except ValueError:
+            invalid += 1
+            continue
+        pairs.append((showcase_id, value))
+
+    if action == "approve":
+        result = approve_many(pairs)
+        verb = "Approved"
+    elif action == "reject":
+        result = reject_many(pairs)
+        verb = "Rejected"
+    else:
+        messages.error(request, "Unknown moderation action.")
+        return redirect("review_queue")
+
+    skipped = result.skipped + invalid
+    messages.info(request, f"{verb} {result.applied} showcases, skipped {skipped}.")
+    return redirect("review_queue")
+
+
+@staff_member_required
+def fragment_stats(request):
+    return JsonResponse(fragments.stats())
+
+
+@staff_member_required
+def export_data(request, dataset):
+    """Stream a dataset as ``?format=csv|ndjson`` with optional
+    ``since``/``until`` dates and an ``after`` id to resume from."""
+    if dataset not in export.DATASETS:
+        raise Http404
+    fmt = request.GET.get("format", "csv")
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest("format must be csv or ndjson.")
+    try:
+        filters = {
+            name: export.parse_bound(request.GET[name])
+            for name in ("since", "until")
+            if request.GET.get(name)
+        }
+        if request.GET.get("after"):
+            filters["after_id"] = int(request.GET["after"])
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+
+    response = StreamingHttpResponse(
+        export.lines(dataset, fmt, header="after_id" not in filters, **filters),
+        content_type=export.FORMATS[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class LuminConfig(AppConfig):
+    name = "lumin"
+
+    def ready(self):
+        import lumin.db  # noqa: F401
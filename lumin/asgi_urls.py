@@ -0,0 +1,10 @@
+"""URLconf for ASGI deployments: the async read views, then everything else."""
+
+from django.urls import include, path
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path("", include("clac.async_urls")),
+    *wsgi_urlpatterns,
+]
@@ -0,0 +1,182 @@
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lumin.db import apply_pragmas
+
+SCHEMA = """
+CREATE TABLE profile (id INTEGER PRIMARY KEY, coins INTEGER NOT NULL, joined REAL);
+CREATE INDEX profile_rank ON profile (coins DESC, joined);
+CREATE TABLE award (id INTEGER PRIMARY KEY, profile_id INTEGER, coins INTEGER);
+"""
+
+
+class Workload:
+    """Moderator-style writes and leaderboard-style reads against one file."""
+
+    def __init__(self, path, profile, rows):
+        self.path = path
+        self.options = profile["OPTIONS"]
+        self.pragmas = profile["PRAGMAS"]
+        self.persistent = bool(profile["CONN_MAX_AGE"])
+        self.rows = rows
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.options.get("timeout", 5),
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        apply_pragmas(conn, self.pragmas)
+        return conn
+
+    def seed(self):
+        conn = self.connect()
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO profile (coins, joined) VALUES (?, ?)",
+            ((random.randrange(2000), time.time() - i) for i in range(self.rows)),
+        )
+        conn.execute("COMMIT")
+        conn.close()
+
+    def write(self, conn):
+        profile_id = random.randrange(1, self.rows + 1)
+        coins = random.randrange(1, 100)
+        begin = self.options.get("transaction_mode", "DEFERRED")
+        conn.execute(f"BEGIN {begin}")
+        try:
+            conn.execute(
+                "UPDATE profile SET coins = coins + ? WHERE id = ?", (coins, profile_id)
+            )
+            conn.execute(
+                "INSERT INTO award (profile_id, coins) VALUES (?, ?)",
+                (profile_id, coins),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            conn.execute("ROLLBACK")
+            raise
+
+    def read(self, conn):
+        conn.execute(
+            "SELECT id, coins FROM profile ORDER BY coins DESC, joined LIMIT 10"
+        ).fetchall()
+        conn.execute(
+            "SELECT coins FROM profile WHERE id = ?",
+            (random.randrange(1, self.rows + 1),),
+        ).fetchone()
+
+    def run(self, kind, deadline, stats):
+        operation = self.write if kind == "write" else self.read
+        conn = self.connect() if self.persistent else None
+        latencies = []
+        errors = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            # Without persistent connections every request opens its own.
+            current = conn or self.connect()
+            try:
+                operation(current)
+                latencies.append(time.perf_counter() - started)
+            except sqlite3.OperationalError:
+                errors += 1
+            finally:
+                if conn is None:
+                    current.close()
+        if conn is not None:
+            conn.close()
+        with stats["lock"]:
+            stats[kind]["latencies"].extend(latencies)
+            stats[kind]["errors"] += errors
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = "Compare SQLite read/write throughput across the DB_PROFILES settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--rows", type=int, default=20_000)
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            help="Profile to run (repeatable). Defaults to every DB_PROFILES entry.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON only.")
+
+    def handle(self, *args, **options):
+        names = options["profiles"] or list(settings.DB_PROFILES)
+        results = {}
+        for name in names:
+            with tempfile.TemporaryDirectory() as directory:
+                workload = Workload(
+                    str(Path(directory) / "bench.sqlite3"),
+                    settings.DB_PROFILES[name],
+                    options["rows"],
+                )
+                workload.seed()
+                results[name] = self.measure(workload, options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, result in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for kind in ("read", "write"):
+                row = result[kind]
+                self.stdout.write(
+                    f"  {kind:5} {row['ops_per_sec']:>10.1f} ops/s  "
+                    f"p50 {row['p50_ms']:.2f} ms  p99 {row['p99_ms']:.2f} ms  "
+                    f"locked errors {row['errors']}"
+                )
+
+    def measure(self, workload, options):
+        stats = {
+            "lock": threading.Lock(),
+            "read": {"latencies": [], "errors": 0},
+            "write": {"latencies": [], "errors": 0},
+        }
+        deadline = time.perf_counter() + options["seconds"]
+        threads = [
+            threading.Thread(target=workload.run, args=(kind, deadline, stats))
+            for kind, count in (
+                ("read", options["readers"]),
+                ("write", options["writers"]),
+            )
+            for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        result = {}
+        for kind in ("read", "write"):
+            latencies = stats[kind]["latencies"]
+            result[kind] = {
+                "ops": len(latencies),
+                "ops_per_sec": len(latencies) / options["seconds"],
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "errors": stats[kind]["errors"],
+            }
+        return result
@@ -4,6 +4,7 @@ Django settings for lumin project.
 Generated by 'django-admin startproject' using Django 5.2.1.
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +28,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "clac.perf.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -36,11 +38,12 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "lumin.urls"
+# lumin.asgi switches this to lumin.asgi_urls, which serves the async views.
+ROOT_URLCONF = os.environ.get("LUMIN_URLCONF", "lumin.urls")
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "clac.perf.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "clac/templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -57,12 +60,119 @@ TEMPLATES = [
 WSGI_APPLICATION = "lumin.wsgi.application"
 
 # Database
+# LUMIN_DB_PROFILE selects how SQLite is run: "tuned" (WAL, relaxed fsync,
+# mmap, busy timeout, persistent connections) or "baseline" (SQLite defaults,
+# one connection per request). PRAGMAS are applied by lumin.db on connect.
+DB_PROFILES = {
+    "baseline": {
+        "OPTIONS": {},
+        "CONN_MAX_AGE": 0,
+        "PRAGMAS": {},
+    },
+    "tuned": {
+        "OPTIONS": {
+            # Seconds to wait on a locked database before raising.
+            "timeout": 20,
+            # Take the write lock at BEGIN so transactions never deadlock
+            # upgrading from a read lock.
+            "transaction_mode": "IMMEDIATE",
+        },
+        "CONN_MAX_AGE": 600,
+        "PRAGMAS": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,  # negative means KiB: 64 MiB
+            "busy_timeout": 20_000,
+            "temp_store": "MEMORY",
+        },
+    },
+}
+DB_PROFILE = os.environ.get("LUMIN_DB_PROFILE", "tuned")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("LUMIN_DB_NAME", BASE_DIR / "db.sqlite3"),
+        "OPTIONS": DB_PROFILES[DB_PROFILE]["OPTIONS"],
+        "CONN_MAX_AGE": DB_PROFILES[DB_PROFILE]["CONN_MAX_AGE"],
+        "CONN_HEALTH_CHECKS": True,
+        # A file-backed test database, so concurrency tests see real SQLite
+        # locking instead of shared-cache table locks.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
+SQLITE_PRAGMAS = DB_PROFILES[DB_PROFILE]["PRAGMAS"]
+
+# Caches
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "markdown": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "markdown",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    # Fragment HTML, their version tokens and hit/miss counters. Shared by
+    # every worker, so a version bump in one process reaches the others.
+    "fragments": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "LUMIN_FRAGMENT_CACHE_DIR", BASE_DIR / ".cache" / "fragments"
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Sessions and the user/profile pairs of clac.auth. Every worker must read
+    # the same entries, or a logout, password change or deactivation handled
+    # by one process is ignored by the others until their copies expire.
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "LUMIN_SESSION_CACHE_DIR", BASE_DIR / ".cache" / "sessions"
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    },
+}
+
+# Sessions are read from the cache and written through to the database.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "sessions"
+
+# request.user (with its profile) comes from the "sessions" cache too.
+AUTHENTICATION_BACKENDS = ["clac.auth.CachedModelBackend"]
+AUTH_USER_CACHE = "sessions"
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Server processes sharing this configuration (gunicorn and uvicorn read the
+# same variable). With more than one, clac refuses a per-process locmem cache
+# for sessions, users and fragments; see clac.auth.ensure_shared_cache().
+WORKER_PROCESSES = int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+# Full-text search engine; clac.search.DatabaseBackend works on any database.
+SEARCH_BACKEND = "clac.search.SQLiteFTSBackend"
+
+# Cache alias and lifetime of {% cachefragment %} blocks (see clac.fragments).
+FRAGMENT_CACHE = "fragments"
+FRAGMENT_CACHE_TIMEOUT = 3600
+
+# Where rendered showcase HTML lives: "column" persists it on the Showcase row,
+# any other value names a cache alias (locmem evicts least recently used).
+MARKDOWN_RENDER_CACHE = "column"
+
+# Per-request query/timing records from clac.perf, one JSON line each.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "clac.perf": {
+            "handlers": ["console"],
+            "level": os.environ.get("LUMIN_PERF_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -96,6 +206,34 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    # Screenshots are stored once per distinct content, named by SHA-256.
+    "screenshots": {"BACKEND": "clac.storage.ContentAddressedStorage"},
+}
+# Uploads stream to a temporary file; screenshots over these limits are
+# rejected while streaming, before Pillow decodes them.
+FILE_UPLOAD_HANDLERS = ["clac.uploads.CappedImageUploadHandler"]
+SCREENSHOT_MAX_BYTES = 5 * 1024 * 1024
+SCREENSHOT_MAX_PIXELS = 24_000_000
+
+# Format of the thumb/card/full screenshot derivatives ("WEBP" or "JPEG").
+SCREENSHOT_DERIVATIVE_FORMAT = "WEBP"
+
+# Background tasks (clac.tasks) are stored in the database and run by
+# "manage.py run_tasks". Set LUMIN_TASKS_EAGER=1 to run them inline instead.
+CLAC_TASKS_EAGER = os.environ.get("LUMIN_TASKS_EAGER", "0") == "1"
+CLAC_TASKS_BACKOFF = 5
+CLAC_TASKS_BACKOFF_MAX = 3600
+
+EMAIL_BACKEND = os.environ.get(
+    "LUMIN_EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+DEFAULT_FROM_EMAIL = "lumina@paycorp.local"
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -0,0 +1,36 @@
+"""Settings for the test suite (pytest.ini points here).
+
+Passwords use the cheap MD5 hasher and the test database lives in memory, so
+each pytest-xdist worker gets its own. Tests that need real SQLite file
+locking are skipped (see ``clac.testing.requires_file_db``); run them with
+``pytest --ds=lumin.settings``.
+"""
+
+import copy
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES, DATABASES, LOGGING
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# No TEST name: Django's SQLite test database is then an in-memory one.
+DATABASES = copy.deepcopy(DATABASES)
+DATABASES["default"]["TEST"] = {"NAME": None}
+
+# One process per database: a shared cache directory would hand one xdist
+# worker's cached users and fragments to another.
+CACHES = copy.deepcopy(CACHES)
+CACHES["sessions"] = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "sessions",
+    "OPTIONS": {"MAX_ENTRIES": 50000},
+}
+CACHES["fragments"] = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "fragments",
+    "OPTIONS": {"MAX_ENTRIES": 10000},
+}
+
+# One JSON line per request is noise in test output.
+LOGGING = copy.deepcopy(LOGGING)
+LOGGING["loggers"]["clac.perf"]["level"] = "WARNING"